@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the Vlasov (papers 3 & 5) and Stella (paper 6) analysis
+
+Heavy libraries (numpy, matplotlib, netCDF4, postgkyl) are imported only
+inside the subcommand that needs them, so catalog queries such as
+listing frames or printing a cached Δ(t) start in well under a second.
+
+Usage:
+    python analyze.py frames RUN_DIR [--tmin T] [--tmax T]
+    python analyze.py delta RUN_DIR [--field-aligned] [--recompute]
+    python analyze.py stella-compare [RESULTS_DIR]
+    python analyze.py stats [statistical_analysis.npz]
+    python analyze.py figures [--dir DIR]
+    python analyze.py estimate INPUT.lua|INPUT.in ... [--cores N] [--memory GB] [--frame F.gkyl]
+                               [--precision float32] [--levels 1 2 3]
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+PAPER6_ANALYSIS = Path(__file__).resolve().parent.parent / 'paper-6-gyrokinetic-validation' / 'analysis'
+PAPER6_RESULTS = PAPER6_ANALYSIS.parent / 'results'
+
+
+def _paper6(module):
+    """Import a paper-6 analysis script by name"""
+    if str(PAPER6_ANALYSIS) not in sys.path:
+        sys.path.insert(0, str(PAPER6_ANALYSIS))
+    return __import__(module)
+
+
+def _time(row):
+    return f"{row['time']:8.2f}" if row['time'] is not None else f"{'?':>8s}"
+
+
+def cmd_frames(args):
+    from run_catalog import update_catalog, frames_in_range
+
+    # stat-only for known files, so frames written by a live run show up cheaply
+    catalog = update_catalog(args.run_dir)
+
+    rows = frames_in_range(catalog, args.tmin, args.tmax, species=args.species, prefix=args.prefix)
+    for row in rows:
+        moments = ','.join(sorted(row['moments'])) or '-'
+        print(f"  frame {row['frame']:4d}  t={_time(row)}  {row['size']/1e9:7.3f} GB  "
+              f"cells={row['cells']}  moments={moments}")
+    print(f"{len(rows)} frames")
+
+
+def cmd_delta(args):
+    from run_catalog import update_catalog, load_catalog, frame_table
+
+    key = 'delta_b' if args.field_aligned else 'delta'
+    catalog = update_catalog(args.run_dir)
+    rows = [row for row in frame_table(catalog, prefix=args.prefix) if 'M2ij' in row['moments']]
+
+    if args.recompute or not rows or any(key not in row['results'] for row in rows):
+        if args.field_aligned:
+            from run_catalog import record_batch
+            from field_aligned import field_aligned_delta
+
+            result = field_aligned_delta(args.run_dir, prefix=args.prefix)
+            record_batch(args.run_dir, {int(frame): {key: value}
+                                        for frame, value in zip(result['frames'], result['delta_avg'])},
+                         prefix=args.prefix)
+        else:
+            from relaxation_maps import delta_series
+            delta_series(args.run_dir, prefix=args.prefix)
+        catalog = load_catalog(args.run_dir)
+        rows = [row for row in frame_table(catalog, prefix=args.prefix) if key in row['results']]
+
+    label = 'Δ(b̂)' if args.field_aligned else 'Δ(z)'
+    print(f"  {'frame':>5s} {'t':>8s} {label:>9s}")
+    for row in rows:
+        print(f"  {row['frame']:5d} {_time(row)} {row['results'][key]:+9.4f}")
+
+
+def cmd_stella_compare(args):
+    _paper6('compare_simulations').main(args.results_dir)
+
+
+def cmd_stats(args):
+    _paper6('compare_simulations').print_statistics(args.npz)
+
+
+def cmd_figures(args):
+    figures = _paper6('create_all_figures')
+    os.chdir(args.dir)
+    figures.main()
+
+
+def cmd_estimate(args):
+    from resource_estimate import run_estimates
+    run_estimates(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('frames', help='list cataloged frames of a run')
+    p.add_argument('run_dir')
+    p.add_argument('--species', default='elc')
+    p.add_argument('--prefix', help='run prefix when several runs share a directory')
+    p.add_argument('--tmin', type=float)
+    p.add_argument('--tmax', type=float)
+    p.set_defaults(func=cmd_frames)
+
+    p = sub.add_parser('delta', help='volume-averaged Δ(t), cached in the run catalog')
+    p.add_argument('run_dir')
+    p.add_argument('--prefix', help='run prefix when several runs share a directory')
+    p.add_argument('--field-aligned', action='store_true', help='project onto the local b̂')
+    p.add_argument('--recompute', action='store_true', help='ignore cached values')
+    p.set_defaults(func=cmd_delta)
+
+    p = sub.add_parser('stella-compare', help='Maxwellian vs Lynden-Bell heat flux from Stella output')
+    p.add_argument('results_dir', nargs='?', default='results')
+    p.set_defaults(func=cmd_stella_compare)
+
+    p = sub.add_parser('stats', help='steady-state heat-flux statistics')
+    p.add_argument('npz', nargs='?', default=str(PAPER6_RESULTS / 'statistical_analysis.npz'))
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser('figures', help='generate the paper 6 figures')
+    p.add_argument('--dir', default='.', help='directory holding statistical_analysis.npz')
+    p.set_defaults(func=cmd_figures)
+
+    p = sub.add_parser('estimate', help='output size and analysis cost of a Gkeyll or Stella input')
+    if sys.argv[1:2] == ['estimate']:
+        # same arguments as resource_estimate.py; imported only here since it needs numpy
+        from resource_estimate import add_estimate_arguments
+        add_estimate_arguments(p)
+    p.set_defaults(func=cmd_estimate)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Field-aligned pressure anisotropy
+
+compute_velocity_widths and the README Δ recipe take z as the parallel
+direction, but v3 perturbs Bx and By, so the local field tilts away
+from z once turbulence develops. This reads the field output next to
+M2ij and projects the pressure tensor onto the local unit vector b̂ in
+every cell:
+
+    P∥ = b̂·P·b̂,   P⊥ = (tr P - P∥) / 2,   Δ = (P⊥ - P∥) / (2 P∥)
+
+The projections are batched over all frames and cells with einsum, so
+the cost is that of the z-aligned version plus one read of the small
+field files.
+
+Usage:
+    python field_aligned.py [RUN_DIR] [-o field_aligned_delta.npz]
+"""
+
+import argparse
+from pathlib import Path
+import numpy as np
+
+from gkyl_frames import load_frame
+from moment_spectra import cell_averages
+from relaxation_maps import pressure_tensor_stack, anisotropy
+from run_catalog import update_catalog, frame_table
+
+# Vlasov-Maxwell field components: Ex, Ey, Ez, Bx, By, Bz, phi, psi
+FIELD_COMPONENTS = 8
+B_SLICE = slice(3, 6)
+
+
+def magnetic_field_stack(run_dir, field_rows):
+    """Cell-average B[frame, x, y, z, 3] from the field files"""
+    stack = []
+    for row in field_rows:
+        _, values = load_frame(Path(run_dir) / row['file'])
+        stack.append(cell_averages(values, FIELD_COMPONENTS)[..., B_SLICE])
+    return np.stack(stack)
+
+
+def project_pressure(P, B):
+    """P∥, P⊥ for pressure tensors P[..., 3, 3] along fields B[..., 3]"""
+    b = B / (np.linalg.norm(B, axis=-1, keepdims=True) + 1e-30)
+    P_par = np.einsum('...i,...ij,...j->...', b, P, b)
+    P_perp = (np.einsum('...ii->...', P) - P_par) / 2
+    return P_par, P_perp
+
+
+def field_aligned_delta(run_dir, prefix=None, species='elc'):
+    """Per-cell and volume-averaged field-aligned Δ, with the z-aligned value for reference"""
+    catalog = update_catalog(run_dir)
+    fields = {row['frame']: row for row in frame_table(catalog, species='field', prefix=prefix)
+              if row['file']}
+    rows = [row for row in frame_table(catalog, species=species, prefix=prefix)
+            if 'M2ij' in row['moments'] and row['frame'] in fields]
+    if not rows:
+        raise ValueError(f"{run_dir}: no frames with both M2ij and field output")
+
+    P = pressure_tensor_stack(run_dir, rows)
+    B = magnetic_field_stack(run_dir, [fields[row['frame']] for row in rows])
+
+    P_par, P_perp = project_pressure(P, B)
+    P_par_z = P[..., 2, 2]
+    P_perp_z = (P[..., 0, 0] + P[..., 1, 1]) / 2
+
+    spatial = (1, 2, 3)
+    b_z = np.abs(B[..., 2]) / (np.linalg.norm(B, axis=-1) + 1e-30)
+    return {
+        'frames': np.array([row['frame'] for row in rows]),
+        'times': np.array([np.nan if row['time'] is None else row['time'] for row in rows]),
+        'P_par': P_par,
+        'P_perp': P_perp,
+        'delta': anisotropy(P_perp, P_par),
+        'delta_avg': anisotropy(P_perp.mean(axis=spatial), P_par.mean(axis=spatial)),
+        'delta_z_avg': anisotropy(P_perp_z.mean(axis=spatial), P_par_z.mean(axis=spatial)),
+        'tilt_deg': np.degrees(np.arccos(np.clip(b_z, 0, 1))),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Field-aligned pressure anisotropy")
+    parser.add_argument('run_dir', nargs='?', default='.')
+    parser.add_argument('--prefix', help='run prefix when several runs share a directory')
+    parser.add_argument('-o', '--output', default='field_aligned_delta.npz')
+    args = parser.parse_args()
+
+    result = field_aligned_delta(args.run_dir, prefix=args.prefix)
+    per_cell = ('P_par', 'P_perp', 'delta', 'tilt_deg')
+    np.savez(args.output, **{key: val.astype(np.float32) if key in per_cell else val
+                             for key, val in result.items()})
+
+    print(f"Field-aligned Δ for {len(result['frames'])} frames -> {args.output}")
+    print(f"  {'frame':>5s} {'t':>8s} {'Δ(b̂)':>9s} {'Δ(z)':>9s} {'max tilt':>9s}")
+    for i, frame in enumerate(result['frames']):
+        print(f"  {frame:5d} {result['times'][i]:8.2f} {result['delta_avg'][i]:+9.4f} "
+              f"{result['delta_z_avg'][i]:+9.4f} {result['tilt_deg'][i].max():8.2f}°")
+
+
+if __name__ == '__main__':
+    main()
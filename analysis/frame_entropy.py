@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Boltzmann and Lynden-Bell coarse-grained entropy per frame
+
+Papers 3 and 5 rest on Lynden-Bell statistical mechanics, so besides
+second moments we track
+
+    S_B  = -∫ f ln f d³x d³v                                (fine-grained)
+    S_LB = -η ∫ [ρ ln ρ + (1 - ρ) ln(1 - ρ)] d³x d³v,  ρ = f̄ / η
+
+where f̄ is f averaged over c×c×c blocks of velocity cells (the
+coarse-graining level c) and η is the maximum phase-space density (the
+single Lynden-Bell level). Cells with f ≤ 0, which the DG solution can
+produce in the tails, are left out of S_B and counted separately.
+
+EntropyAccumulator plugs into frame_moments, so entropies come from the
+same single streamed pass over x-slabs as σ(v∥) and σ(v⊥). S_B and the
+fine maximum are accumulated per slab; the coarse-grained blocks are
+kept (at most 1/8 of the cell-average array for c ≥ 2) and S_LB is
+evaluated at the end of the pass, with η from the caller or, if not
+given, the frame's own maximum. entropy_series uses the first frame's
+maximum for every frame so the S_LB series share one η.
+
+With numba installed, frame_diagnostics uses the fused compiled kernel
+of frame_kernels.py instead, except for --precision float32 (--backend
+numpy forces this path).
+
+Usage:
+    python frame_entropy.py [RUN_DIR] [--levels 1 2 3] [-o entropy_series.npz]
+"""
+
+import argparse
+from pathlib import Path
+import numpy as np
+
+from frame_moments import PRECISIONS, widths_from_moments
+from run_catalog import update_catalog, frame_table, record_results
+
+DEFAULT_LEVELS = (1, 2, 3)
+
+
+class EntropyAccumulator:
+    """Streaming S_B and coarse-grained S_LB over the x-slabs of one frame"""
+
+    def __init__(self, header, levels=DEFAULT_LEVELS, eta=None):
+        cells, lower, upper = header['cells'], header['lower'], header['upper']
+        widths = [(upper[d] - lower[d]) / cells[d] for d in range(6)]
+        self.dx3 = widths[0] * widths[1] * widths[2]
+        self.dv3 = widths[3] * widths[4] * widths[5]
+        # zeroth coefficient of the orthonormal p=1 basis -> cell average
+        self.scale = 2.0**(-len(cells) / 2)
+
+        nv = cells[3:6]
+        for c in levels:
+            if any(n % c for n in nv):
+                raise ValueError(f"coarse-graining level {c} does not divide velocity cells {nv}")
+        self.levels = tuple(levels)
+        self.eta = eta
+
+        self.s_boltzmann = 0.0
+        self.f_max = 0.0
+        self.n_negative = 0
+        self.n_cells = 0
+        self.coarse = {c: [] for c in self.levels}
+
+    def add(self, i0, f):
+        """Accumulate one slab f[x, y, z, vx, vy, vz] of zeroth coefficients"""
+        f = np.asarray(f) * self.scale
+        positive = f > 0
+        fp = np.where(positive, f, 1.0)
+        self.s_boltzmann -= float(np.sum(np.where(positive, fp * np.log(fp), 0.0), dtype=np.float64))
+        self.f_max = max(self.f_max, float(f.max()))
+        self.n_negative += int(f.size - np.count_nonzero(positive))
+        self.n_cells += f.size
+
+        nvx, nvy, nvz = f.shape[3:]
+        for c in self.levels:
+            blocks = f.reshape(f.shape[:3] + (nvx // c, c, nvy // c, c, nvz // c, c))
+            self.coarse[c].append(blocks.mean(axis=(4, 6, 8), dtype=np.float64))
+
+    def result(self):
+        """S_B, S_LB per level, the η used and the fraction of f ≤ 0 cells"""
+        eta = self.eta if self.eta is not None else self.f_max
+        s_lb = {}
+        for c in self.levels:
+            rho = np.clip(np.concatenate(self.coarse[c]) / eta, 0.0, 1.0)
+            terms = np.zeros_like(rho)
+            inside = (rho > 0) & (rho < 1)
+            r = rho[inside]
+            terms[inside] = r * np.log(r) + (1 - r) * np.log1p(-r)
+            s_lb[c] = float(-eta * np.sum(terms) * c**3 * self.dv3 * self.dx3)
+        return {
+            'S_B': self.s_boltzmann * self.dv3 * self.dx3,
+            'S_LB': s_lb,
+            'eta': eta,
+            'f_max': self.f_max,
+            'negative_fraction': self.n_negative / max(self.n_cells, 1),
+        }
+
+
+def frame_diagnostics(path, levels=DEFAULT_LEVELS, eta=None, precision='float64', slab=1,
+                      backend=None):
+    """σ(v∥), σ(v⊥) and entropies of one frame from a single streamed pass
+
+    backend selects the kernels (frame_kernels.BACKENDS); by default the
+    compiled numba kernel when numba is installed, else NumPy. float32
+    precision always runs the NumPy kernels, which have that mode.
+    """
+    # deferred: importing frame_kernels pulls in numba when it is installed
+    from frame_kernels import reduce_frame
+
+    result = reduce_frame(path, backend, levels=levels, eta=eta, precision=precision, slab=slab,
+                          pitch=False)
+    M = result.pop('M')
+    v_par_std, v_perp_std = widths_from_moments(M)
+    result['v_par_std'] = float(v_par_std.mean())
+    result['v_perp_std'] = float(v_perp_std.mean())
+    return result
+
+
+def entropy_series(run_dir, levels=DEFAULT_LEVELS, eta=None, precision='float64', prefix=None,
+                   backend=None, verbose=True):
+    """Entropy time series over all cataloged frames, stored in the catalog as well"""
+    catalog = update_catalog(run_dir)
+    rows = [row for row in frame_table(catalog, prefix=prefix) if row['file']]
+
+    series = {'frames': [], 'times': [], 'S_B': [], 'S_LB': [], 'v_par_std': [], 'v_perp_std': []}
+    for row in rows:
+        result = frame_diagnostics(Path(run_dir) / row['file'], levels=levels, eta=eta,
+                                   precision=precision, backend=backend)
+        if eta is None:
+            eta = result['eta']
+
+        series['frames'].append(row['frame'])
+        series['times'].append(np.nan if row['time'] is None else row['time'])
+        series['S_B'].append(result['S_B'])
+        series['S_LB'].append([result['S_LB'][c] for c in levels])
+        series['v_par_std'].append(result['v_par_std'])
+        series['v_perp_std'].append(result['v_perp_std'])
+
+        stored = {'S_B': result['S_B'], 'v_par_std': result['v_par_std'],
+                  'v_perp_std': result['v_perp_std']}
+        stored.update({f'S_LB_c{c}': result['S_LB'][c] for c in levels})
+        catalog = record_results(run_dir, row['frame'], stored, catalog=catalog, prefix=row['prefix'])
+
+        if verbose:
+            lb = ', '.join(f"c={c}: {result['S_LB'][c]:.6e}" for c in levels)
+            print(f"  Frame {row['frame']:3d} (t={series['times'][-1]:.2f}): "
+                  f"S_B={result['S_B']:.6e}, S_LB [{lb}]")
+
+    out = {key: np.array(val) for key, val in series.items()}
+    out['levels'] = np.array(levels)
+    out['eta'] = eta
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Boltzmann and Lynden-Bell entropy time series")
+    parser.add_argument('run_dir', nargs='?', default='.')
+    parser.add_argument('--prefix', help='run prefix when several runs share a directory')
+    parser.add_argument('--levels', type=int, nargs='+', default=list(DEFAULT_LEVELS),
+                        help='velocity coarse-graining block sizes')
+    parser.add_argument('--eta', type=float, help='Lynden-Bell phase density level (default: max f of first frame)')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64')
+    parser.add_argument('--backend', choices=('numpy', 'numba'),
+                        help='reduction kernels (default: numba if installed)')
+    parser.add_argument('-o', '--output', default='entropy_series.npz')
+    args = parser.parse_args()
+
+    series = entropy_series(args.run_dir, levels=args.levels, eta=args.eta,
+                            precision=args.precision, prefix=args.prefix,
+                            backend=args.backend)
+    np.savez(args.output, **series)
+    print(f"Entropy series for {len(series['frames'])} frames (η = {series['eta']:.6e}) -> {args.output}")
+
+
+if __name__ == '__main__':
+    main()
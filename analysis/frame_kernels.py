@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Kernel backends for the per-frame reductions: moments, pitch angle, entropy
+
+Every frame is reduced to
+
+    M[x, 4]         n, n<v∥>, n<v∥²>, n<v⊥²> sums per spatial cell (frame_moments)
+    S_B, S_LB       Boltzmann and coarse-grained Lynden-Bell entropy (frame_entropy)
+    f_max, f ≤ 0    maximum and count of non-positive cells
+    pitch_angle     f d³x d³v summed in bins of μ = cos θ = v∥/|v|
+
+backend='numpy' is the reference: frame_moments streams x-slabs through a
+matrix product while EntropyAccumulator and PitchAngleAccumulator see the
+same slab. Each of them is a separate vectorised pass with its own
+temporaries.
+
+backend='numba' compiles one loop per spatial cell that walks the
+velocity cube once and updates all of the above in registers, in
+parallel over the cells of a slab (numba.prange, all cores). It reads the
+strided coefficient-0 view of the memory-mapped frame directly, so no
+copy of the slab is made. Sums are always accumulated in float64
+whatever the file precision. The only arrays it writes are the per-cell
+outputs and the coarse-grained block sums that S_LB needs, which are
+turned into S_LB terms slab by slab and dropped. When η is not given, a
+cheap first pass over the slabs finds max f before the fused pass, so
+the block sums of the whole frame are never held at once. The kernels
+release the GIL (nogil), so a work_queue worker's heartbeat thread keeps
+running during a reduction.
+
+numba is optional. Without it only the NumPy backend is available, and
+DEFAULT_BACKEND falls back to it. The compiled kernel has no float32
+mode, so precision='float32' always runs the NumPy backend (resolve_backend).
+The pitch-angle histogram is optional (pitch=False skips it in both
+backends); frame_entropy.frame_diagnostics does not need it.
+
+check_backends (--check) runs both on a frame and reports the largest
+relative difference of every output. self_test (--self-test) does the
+same on small synthetic frames written in the gkylzero layout, float64
+and float32, and fails if any difference exceeds BACKEND_RTOL, so the
+backends can be checked without simulation data.
+
+Usage:
+    python frame_kernels.py FRAME.gkyl [--backend numba] [--bins 36] [--threads N]
+    python frame_kernels.py FRAME.gkyl --check
+    python frame_kernels.py --self-test
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from gkyl_frames import read_header, load_frame, velocity_grid, write_frame
+from frame_moments import MOMENTS, PRECISIONS, frame_moments, iter_slabs
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ('numpy', 'numba')
+DEFAULT_BACKEND = 'numba' if numba is not None else 'numpy'
+DEFAULT_LEVELS = (1, 2, 3)
+N_PITCH_BINS = 36
+BACKEND_RTOL = 1e-10
+
+
+def resolve_backend(backend=None, precision='float64'):
+    """Backend name to use; 'numba' requires numba and float64 accumulation"""
+    if backend is None:
+        backend = DEFAULT_BACKEND if precision == 'float64' else 'numpy'
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend}")
+    if backend == 'numba' and numba is None:
+        raise ValueError("backend 'numba' requested but numba is not installed")
+    if backend == 'numba' and precision != 'float64':
+        raise ValueError(f"backend 'numba' accumulates in float64 only, not {precision}")
+    return backend
+
+
+def pitch_bins(header, n_bins=N_PITCH_BINS):
+    """Bin index of μ = v∥/|v| for every velocity cell (flattened), and the bin edges"""
+    VX, VY, VZ, _ = velocity_grid(header)
+    speed = np.sqrt(VX**2 + VY**2 + VZ**2)
+    mu = np.divide(VZ, speed, out=np.zeros_like(VZ), where=speed > 0)
+    edges = np.linspace(-1.0, 1.0, n_bins + 1)
+    index = np.clip(np.searchsorted(edges, mu.ravel(), side='right') - 1, 0, n_bins - 1)
+    return index.astype(np.int64), edges
+
+
+def block_index(cells_v, levels):
+    """Flat coarse-grained block of every velocity cell, per level, with level offsets"""
+    nvx, nvy, nvz = cells_v
+    ix, iy, iz = np.meshgrid(np.arange(nvx), np.arange(nvy), np.arange(nvz), indexing='ij')
+    index = np.empty((len(levels), nvx * nvy * nvz), dtype=np.int64)
+    offsets = [0]
+    for l, c in enumerate(levels):
+        nby, nbz = nvy // c, nvz // c
+        index[l] = (offsets[-1] + ((ix // c) * nby + iy // c) * nbz + iz // c).ravel()
+        offsets.append(offsets[-1] + (nvx // c) * nby * nbz)
+    return index, np.array(offsets)
+
+
+class PitchAngleAccumulator:
+    """Streaming pitch-angle distribution ∫ f d³x d³v in μ bins (NumPy reference)"""
+
+    def __init__(self, header, n_bins=N_PITCH_BINS):
+        cells, lower, upper = header['cells'], header['lower'], header['upper']
+        widths = [(upper[d] - lower[d]) / cells[d] for d in range(6)]
+        self.volume = np.prod(widths)
+        self.scale = 2.0**(-len(cells) / 2)
+        self.index, self.edges = pitch_bins(header, n_bins)
+        self.hist = np.zeros(n_bins)
+
+    def add(self, i0, f):
+        f = np.asarray(f)
+        per_velocity = f.reshape(-1, self.index.size).sum(axis=0, dtype=np.float64)
+        self.hist += np.bincount(self.index, weights=per_velocity, minlength=self.hist.size)
+
+    def result(self):
+        return self.hist * self.scale * self.volume
+
+
+def _reduce_numpy(path, levels, eta, n_bins, precision, slab, pitch):
+    """Reference: frame_moments with the entropy and pitch-angle accumulators"""
+    from frame_entropy import EntropyAccumulator
+
+    header = read_header(path)
+    entropy = EntropyAccumulator(header, levels=levels, eta=eta)
+    accumulators = [entropy]
+    if pitch:
+        accumulators.append(PitchAngleAccumulator(header, n_bins))
+    M, _ = frame_moments(path, precision=precision, slab=slab, accumulators=accumulators)
+    result = entropy.result()
+    result['M'] = M
+    if pitch:
+        result.update({'pitch_angle': accumulators[1].result(), 'pitch_edges': accumulators[1].edges})
+    return result
+
+
+if numba is not None:
+
+    @numba.njit(parallel=True, cache=True, nogil=True)
+    def _fused_cells(f, w_par, w_par_sq, w_perp_sq, scale, pitch, pitch_index, blocks,
+                     M, s_b, f_max, n_negative, hist, coarse):
+        """One pass over the velocity cube of every cell: moments, f ln f, max, μ bins, blocks"""
+        n_cells, n_v = f.shape
+        n_levels = blocks.shape[0]
+        for i in numba.prange(n_cells):
+            m0 = 0.0
+            m1 = 0.0
+            m2 = 0.0
+            m3 = 0.0
+            sb = 0.0
+            fm = -np.inf
+            neg = 0
+            for j in range(n_v):
+                x = np.float64(f[i, j])
+                m0 += x
+                m1 += x * w_par[j]
+                m2 += x * w_par_sq[j]
+                m3 += x * w_perp_sq[j]
+                xs = x * scale
+                if xs > 0.0:
+                    sb += xs * np.log(xs)
+                else:
+                    neg += 1
+                if xs > fm:
+                    fm = xs
+                if pitch:
+                    hist[i, pitch_index[j]] += xs
+                for l in range(n_levels):
+                    coarse[i, blocks[l, j]] += xs
+            M[i, 0] = m0
+            M[i, 1] = m1
+            M[i, 2] = m2
+            M[i, 3] = m3
+            s_b[i] = sb
+            f_max[i] = fm
+            n_negative[i] = neg
+
+    @numba.njit(parallel=True, cache=True, nogil=True)
+    def _lynden_bell_sums(coarse, offsets, block_cells, eta):
+        """Σ [ρ ln ρ + (1-ρ) ln(1-ρ)] per level, ρ = block mean / η (clipped to [0, 1])"""
+        n_cells = coarse.shape[0]
+        n_levels = offsets.size - 1
+        partial = np.zeros((n_cells, n_levels))
+        for i in numba.prange(n_cells):
+            for l in range(n_levels):
+                total = 0.0
+                for b in range(offsets[l], offsets[l + 1]):
+                    rho = coarse[i, b] / (block_cells[l] * eta)
+                    if rho > 0.0 and rho < 1.0:
+                        total += rho * np.log(rho) + (1.0 - rho) * np.log1p(-rho)
+                partial[i, l] = total
+        return partial.sum(axis=0)
+
+
+def _reduce_numba(path, levels, eta, n_bins, slab, pitch):
+    """Fused, multithreaded reduction of one frame"""
+    header, values = load_frame(path)
+    cells, lower, upper = header['cells'], header['lower'], header['upper']
+    widths = [(upper[d] - lower[d]) / cells[d] for d in range(6)]
+    volume = float(np.prod(widths))
+    scale = 2.0**(-len(cells) / 2)
+    spatial, cells_v = cells[:3], cells[3:]
+    n_v = int(np.prod(cells_v))
+
+    for c in levels:
+        if any(n % c for n in cells_v):
+            raise ValueError(f"coarse-graining level {c} does not divide velocity cells {cells_v}")
+    VX, VY, VZ, _ = velocity_grid(header)
+    w_par, w_par_sq, w_perp_sq = VZ.ravel(), (VZ**2).ravel(), (VX**2 + VY**2).ravel()
+    pitch_index, edges = pitch_bins(header, n_bins)
+    blocks, offsets = block_index(cells_v, levels)
+    block_cells = np.array([c**3 for c in levels], dtype=np.float64)
+
+    plane = spatial[1] * spatial[2]
+    n_max = min(slab, spatial[0]) * plane
+    M = np.empty(spatial + (len(MOMENTS),))
+    s_b = np.empty(n_max)
+    f_max = np.empty(n_max)
+    n_negative = np.empty(n_max, dtype=np.int64)
+    hist = np.zeros((n_max, n_bins if pitch else 0))
+    coarse = np.zeros((n_max, offsets[-1]))
+
+    if eta is None and levels:
+        # first pass for η = max f, so the S_LB terms can be summed slab by slab below
+        eta = scale * max(float(np.asarray(f).max()) for _, f in iter_slabs(values, slab))
+
+    totals = {'s_b': 0.0, 'f_max': -np.inf, 'n_negative': 0}
+    lb_sums = np.zeros(len(levels))
+    pitch_hist = np.zeros(n_bins)
+    for i0, f in iter_slabs(values, slab):
+        n_x = f.shape[0]
+        n = n_x * plane
+        hist[:n] = 0.0
+        coarse[:n] = 0.0
+        _fused_cells(np.asarray(f).reshape(n, n_v), w_par, w_par_sq, w_perp_sq, scale,
+                     pitch, pitch_index, blocks, M[i0:i0 + n_x].reshape(n, -1),
+                     s_b[:n], f_max[:n], n_negative[:n], hist[:n], coarse[:n])
+        totals['s_b'] += s_b[:n].sum()
+        totals['f_max'] = max(totals['f_max'], f_max[:n].max())
+        totals['n_negative'] += int(n_negative[:n].sum())
+        if pitch:
+            pitch_hist += hist[:n].sum(axis=0)
+        if levels:
+            lb_sums += _lynden_bell_sums(coarse[:n], offsets, block_cells, eta)
+
+    if eta is None:
+        eta = totals['f_max']
+
+    n_cells = int(np.prod(cells))
+    result = {
+        'S_B': -totals['s_b'] * volume,
+        'S_LB': {c: float(-eta * lb_sums[l] * c**3 * volume) for l, c in enumerate(levels)},
+        'eta': eta,
+        'f_max': totals['f_max'],
+        'negative_fraction': totals['n_negative'] / n_cells,
+        'M': M,
+    }
+    if pitch:
+        result.update({'pitch_angle': pitch_hist * volume, 'pitch_edges': edges})
+    return result
+
+
+def reduce_frame(path, backend=None, levels=DEFAULT_LEVELS, eta=None, n_bins=N_PITCH_BINS,
+                 precision='float64', slab=1, pitch=True):
+    """Moments, entropies and (with pitch) pitch-angle distribution of one frame
+
+    The compiled kernel always accumulates in float64; float32 precision
+    selects the NumPy backend (see resolve_backend).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown precision: {precision}")
+    backend = resolve_backend(backend, precision)
+    levels = tuple(levels)
+    if backend == 'numba':
+        return _reduce_numba(path, levels, eta, n_bins, slab, pitch)
+    return _reduce_numpy(path, levels, eta, n_bins, precision, slab, pitch)
+
+
+def _relative_difference(a, b, scale=None):
+    """Largest |b - a| relative to the largest |a| (or to scale)"""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    if scale is None:
+        scale = np.max(np.abs(a))
+    return float(np.max(np.abs(b - a)) / max(scale, 1e-300))
+
+
+def check_backends(path, levels=DEFAULT_LEVELS, eta=None, n_bins=N_PITCH_BINS, slab=1):
+    """Largest relative difference of every output between the numba and NumPy backends"""
+    reference = reduce_frame(path, 'numpy', levels=levels, eta=eta, n_bins=n_bins, slab=slab)
+    compiled = reduce_frame(path, 'numba', levels=levels, eta=eta, n_bins=n_bins, slab=slab)
+    worst = {}
+    M = reference['M']
+    for k, name in enumerate(MOMENTS):
+        # n<v∥> vanishes for symmetric cells; |n<v∥>| ≤ sqrt(n n<v∥²>) sets its scale
+        scale = np.max(np.sqrt(np.abs(M[..., 0] * M[..., 2]))) if name == 'n_v_par' else None
+        worst[name] = _relative_difference(M[..., k], compiled['M'][..., k], scale)
+    for key in ('S_B', 'eta', 'f_max', 'pitch_angle'):
+        worst[key] = _relative_difference(reference[key], compiled[key])
+    for c in levels:
+        worst[f'S_LB_c{c}'] = _relative_difference(reference['S_LB'][c], compiled['S_LB'][c])
+    worst['negative_fraction'] = abs(reference['negative_fraction'] - compiled['negative_fraction'])
+    return worst
+
+
+def synthetic_frame(path, cells=(4, 4, 4, 6, 6, 6), dtype=np.float64, ncomp=2, seed=0):
+    """Write a bi-Maxwellian test frame with a density wave and a few f < 0 tail cells"""
+    rng = np.random.default_rng(seed)
+    L, vmax = 2 * np.pi, 4.0
+    lower, upper = [0, 0, 0] + [-vmax] * 3, [L] * 3 + [vmax] * 3
+    axes = [np.linspace(lower[d], upper[d], cells[d], endpoint=False) + (upper[d] - lower[d]) / (2 * cells[d])
+            for d in range(6)]
+    X, Y, Z, VX, VY, VZ = np.meshgrid(*axes, indexing='ij', sparse=True)
+    t_par = 0.5 * (1 + 0.05 * rng.standard_normal(cells[:3]))[..., None, None, None]
+    n = 1 + 0.15 * np.cos(X + Y + 2 * Z + 1.0)
+    f = n / np.sqrt(t_par) * np.exp(-(VX**2 + VY**2) / 1.6 - VZ**2 / (2 * t_par))
+    f = f - 1e-4 * f.max() * (rng.random(f.shape) < 0.01)
+    values = np.zeros(f.shape + (ncomp,))
+    values[..., 0] = f * 2**3
+    values[..., 1:] = 0.01 * rng.standard_normal(f.shape + (ncomp - 1,))
+    write_frame(path, values.astype(dtype), lower, upper)
+
+
+def self_test(levels=(1, 2, 3), slabs=(1, 3)):
+    """check_backends on synthetic float64 and float32 frames; AssertionError above BACKEND_RTOL"""
+    worst = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for dtype in (np.float64, np.float32):
+            path = os.path.join(tmp, f'synthetic-elc_{np.dtype(dtype).name}_0.gkyl')
+            synthetic_frame(path, dtype=dtype)
+            # free η (frame maximum) and a fixed η below it, so ρ is clipped at 1
+            for eta in (None, 0.8 * reduce_frame(path, 'numpy', levels=())['f_max']):
+                for slab in slabs:
+                    label = f"{np.dtype(dtype).name}, slab {slab}, η {'free' if eta is None else 'fixed'}"
+                    worst[label] = max(check_backends(path, levels=levels, eta=eta, slab=slab).values())
+    for label, value in worst.items():
+        print(f"    {label:32s} {value:.2e}")
+    failed = [label for label, value in worst.items() if not value <= BACKEND_RTOL]
+    assert not failed, f"numba and numpy backends differ by more than {BACKEND_RTOL:.0e}: {failed}"
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fused frame reductions (NumPy or numba backend)")
+    parser.add_argument('frame', nargs='?', help='distribution-function frame (.gkyl)')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND)
+    parser.add_argument('--levels', type=int, nargs='*', default=list(DEFAULT_LEVELS))
+    parser.add_argument('--bins', type=int, default=N_PITCH_BINS, help='pitch-angle bins in cos θ')
+    parser.add_argument('--slab', type=int, default=1, help='x-planes per streamed slab')
+    parser.add_argument('--threads', type=int, help='numba threads (default: all cores)')
+    parser.add_argument('--check', action='store_true', help='compare the numba backend against NumPy')
+    parser.add_argument('--self-test', action='store_true',
+                        help='compare the backends on synthetic frames (no data needed)')
+    args = parser.parse_args()
+
+    if args.threads and numba is not None:
+        numba.set_num_threads(args.threads)
+
+    if args.self_test:
+        if numba is None:
+            print("numba not installed: only the NumPy backend is available, nothing to compare")
+            return
+        self_test()
+        print(f"  numba vs numpy on synthetic frames: OK (tolerance {BACKEND_RTOL:.0e})")
+        return
+    if args.frame is None:
+        parser.error('a frame is required unless --self-test is given')
+
+    start = time.perf_counter()
+    result = reduce_frame(args.frame, args.backend, levels=args.levels, n_bins=args.bins, slab=args.slab)
+    elapsed = time.perf_counter() - start
+    lb = ', '.join(f"c={c}: {value:.6e}" for c, value in result['S_LB'].items())
+    print(f"{args.frame} ({args.backend}, {elapsed:.2f} s): S_B={result['S_B']:.6e}, S_LB [{lb}]")
+    centres = 0.5 * (result['pitch_edges'][1:] + result['pitch_edges'][:-1])
+    anisotropy = np.sum(result['pitch_angle'] * centres**2) / np.sum(result['pitch_angle'])
+    print(f"  <cos²θ> = {anisotropy:.6f} (1/3 when isotropic), f ≤ 0 in "
+          f"{100*result['negative_fraction']:.3f}% of cells")
+
+    if args.check:
+        if numba is None:
+            print("  numba not installed: only the NumPy backend is available")
+            return
+        worst = check_backends(args.frame, levels=args.levels, n_bins=args.bins, slab=args.slab)
+        status = 'OK' if max(worst.values()) <= BACKEND_RTOL else 'ABOVE TOLERANCE'
+        for name, value in worst.items():
+            print(f"    {name:18s} {value:.2e}")
+        print(f"  numba vs numpy: max rel. diff {max(worst.values()):.2e} "
+              f"(tolerance {BACKEND_RTOL:.0e}) {status}")
+
+
+if __name__ == '__main__':
+    main()
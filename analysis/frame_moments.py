@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Streaming per-cell velocity moments of a 6D frame, with a precision mode
+
+The frame is memory-mapped and processed one x-slab at a time, so the
+working set is a few slabs instead of several float64 copies of the
+whole 6D array. All four moments (n, n<v∥>, n<v∥²>, n<v⊥²>) come out
+of one pass over each slab.
+
+precision='float64' is the reference: the slab is promoted to float64
+and reduced with one matrix product against the velocity weights.
+
+precision='float32' keeps the slab and all temporaries in float32,
+halving memory traffic and footprint. Each velocity plane is reduced
+with NumPy's pairwise summation and the planes are combined with a
+Kahan-compensated sum, so the float32 sums carry O(ε) rather than
+O(N ε) rounding error. Only the per-cell ratios and square roots are
+done in float64. On smooth bi-Maxwellian frames σ(v∥) and σ(v⊥) agree
+with the float64 path to a relative 1e-6 (FLOAT32_RTOL); check_precision
+measures it for a given frame. Files written in double precision are
+still read as float64 from disk, but cast slab by slab.
+
+Usage:
+    python frame_moments.py FRAME.gkyl [--precision float32] [--check]
+"""
+
+import argparse
+import numpy as np
+
+from gkyl_frames import load_frame, velocity_grid
+
+PRECISIONS = ('float64', 'float32')
+FLOAT32_RTOL = 1e-6
+
+MOMENTS = ('n', 'n_v_par', 'n_v_par_sq', 'n_v_perp_sq')
+
+
+def velocity_weights(header, dtype=np.float64):
+    """Weights W[moment, Nvx, Nvy*Nvz] for MOMENTS (cell volume dv cancels)"""
+    VX, VY, VZ, _ = velocity_grid(header)
+    W = np.stack([np.ones_like(VZ), VZ, VZ**2, VX**2 + VY**2])
+    return W.reshape(len(MOMENTS), VZ.shape[0], -1).astype(dtype)
+
+
+def iter_slabs(values, slab=1, component=0):
+    """Yield (i0, f) with f = values[i0:i0+slab, ..., component] read from disk"""
+    for i0 in range(0, values.shape[0], slab):
+        yield i0, values[i0:i0 + slab, ..., component]
+
+
+def _moments_float64(f, W):
+    """Reference reduction: one float64 matrix product per slab"""
+    f = np.asarray(f, dtype=np.float64).reshape(f.shape[0], -1)
+    return f @ W.reshape(W.shape[0], -1).T
+
+
+def _moments_float32(f, W):
+    """Pairwise sums within velocity planes, Kahan-compensated across planes"""
+    f = np.asarray(f, dtype=np.float32).reshape(f.shape[0], W.shape[1], -1)
+    total = np.zeros((f.shape[0], W.shape[0]), dtype=np.float32)
+    comp = np.zeros_like(total)
+    for p in range(W.shape[1]):
+        plane = np.add.reduce(f[:, None, p, :] * W[None, :, p, :], axis=-1)
+        y = plane - comp
+        t = total + y
+        comp = (t - total) - y
+        total = t
+    return total
+
+
+def frame_moments(path, precision='float64', slab=1, accumulators=()):
+    """Per-cell moment sums M[Nx, Ny, Nz, 4] (ordered as MOMENTS) and the header
+
+    Each slab is read from disk once; accumulators (objects with an
+    add(i0, f) method, e.g. frame_entropy.EntropyAccumulator) see the same
+    in-memory slab, so extra diagnostics need no second read.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown precision: {precision}")
+
+    header, values = load_frame(path)
+    dtype = np.float32 if precision == 'float32' else np.float64
+    W = velocity_weights(header, dtype)
+    reduce = _moments_float32 if precision == 'float32' else _moments_float64
+
+    spatial = header['cells'][:3]
+    M = np.empty(spatial + (len(MOMENTS),))
+    for i0, f in iter_slabs(values, slab):
+        f = np.asarray(f, dtype=dtype)
+        n_x = f.shape[0]
+        sums = reduce(f.reshape((-1,) + f.shape[3:]), W)
+        M[i0:i0 + n_x] = sums.reshape((n_x,) + spatial[1:] + (len(MOMENTS),))
+        for acc in accumulators:
+            acc.add(i0, f)
+    return M, header
+
+
+def widths_from_moments(M):
+    """Per-cell σ(v∥), σ(v⊥) from moment sums, as in compute_velocity_widths"""
+    n = M[..., 0] + 1e-30
+    v_par_mean = M[..., 1] / n
+    v_par_std = np.sqrt(np.maximum(0, M[..., 2] / n - v_par_mean**2))
+    v_perp_std = np.sqrt(M[..., 3] / n)
+    return v_par_std, v_perp_std
+
+
+def velocity_widths(path, precision='float64', slab=1):
+    """Volume-averaged σ(v∥), σ(v⊥) of a frame (uniform spatial cells)"""
+    M, _ = frame_moments(path, precision=precision, slab=slab)
+    v_par_std, v_perp_std = widths_from_moments(M)
+    return v_par_std.mean(), v_perp_std.mean()
+
+
+def check_precision(path, slab=1):
+    """Largest relative difference of per-cell σ between float32 and float64"""
+    M64, _ = frame_moments(path, precision='float64', slab=slab)
+    M32, _ = frame_moments(path, precision='float32', slab=slab)
+    worst = {}
+    for name, a, b in zip(('sigma_par', 'sigma_perp'), widths_from_moments(M64), widths_from_moments(M32)):
+        worst[name] = float(np.max(np.abs(b - a) / np.abs(a)))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming σ(v∥), σ(v⊥) of one frame")
+    parser.add_argument('frame', help='distribution-function frame (.gkyl)')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64')
+    parser.add_argument('--slab', type=int, default=1, help='x-planes per streamed slab')
+    parser.add_argument('--check', action='store_true', help='compare float32 against float64')
+    args = parser.parse_args()
+
+    v_par_std, v_perp_std = velocity_widths(args.frame, precision=args.precision, slab=args.slab)
+    print(f"{args.frame} ({args.precision}): σ(v∥)={v_par_std:.6f}, σ(v⊥)={v_perp_std:.6f}")
+
+    if args.check:
+        worst = check_precision(args.frame, slab=args.slab)
+        status = 'OK' if max(worst.values()) <= FLOAT32_RTOL else 'ABOVE TOLERANCE'
+        print(f"  float32 vs float64: max rel. diff σ(v∥) {worst['sigma_par']:.2e}, "
+              f"σ(v⊥) {worst['sigma_perp']:.2e} (tolerance {FLOAT32_RTOL:.0e}) {status}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Lightweight access to Gkeyll .gkyl frame files
+
+Parses the gkylzero binary header directly so that a 6D frame can be
+memory-mapped and read one spatial cell at a time instead of loading the
+whole ~1.1 GB file through postgkyl. Only the single-range field layout
+(file_type 1, written by single-GPU runs) can be memory-mapped; other
+layouts fall back to a full postgkyl read.
+
+The frame time lives in the msgpack metadata block. If it cannot be
+decoded (msgpack not installed, corrupt block) the header carries
+'meta_error' and time None, so callers can tell "unknown" from "absent".
+"""
+
+import re
+import sys
+import glob
+import numpy as np
+
+GKYL_MAGIC = b'gkyl0'
+POSTGKYL_PATH = '/root/postgkyl'
+FRAME_NUMBER = re.compile(r'_(\d+)\.gkyl$')
+
+
+def read_header(path):
+    """Parse the header of a gkylzero .gkyl file (no data is read)"""
+    with open(path, 'rb') as fh:
+        magic = fh.read(5)
+        if magic != GKYL_MAGIC:
+            raise ValueError(f"{path}: not a gkylzero file (magic={magic!r})")
+
+        version, file_type, meta_size = np.fromfile(fh, dtype='<u8', count=3)
+        meta_raw = fh.read(int(meta_size))
+
+        real_type, ndim = np.fromfile(fh, dtype='<u8', count=2)
+        ndim = int(ndim)
+        cells = tuple(int(c) for c in np.fromfile(fh, dtype='<u8', count=ndim))
+        lower = np.fromfile(fh, dtype='<f8', count=ndim)
+        upper = np.fromfile(fh, dtype='<f8', count=ndim)
+        esznc, size = np.fromfile(fh, dtype='<u8', count=2)
+        offset = fh.tell()
+
+    dtype = np.dtype('<f4') if real_type == 1 else np.dtype('<f8')
+    try:
+        meta, meta_error = _unpack_meta(meta_raw), None
+    except ValueError as err:
+        meta, meta_error = {}, str(err)
+
+    return {
+        'path': str(path),
+        'version': int(version),
+        'file_type': int(file_type),
+        'meta': meta,
+        'meta_error': meta_error,
+        'time': meta.get('time') if meta else None,
+        'dtype': dtype,
+        'ndim': ndim,
+        'cells': cells,
+        'lower': lower,
+        'upper': upper,
+        'ncomp': int(esznc) // dtype.itemsize,
+        'size': int(size),
+        'offset': offset,
+    }
+
+
+def write_frame(path, values, lower, upper, time=0.0, frame=0):
+    """Write values[cells..., ncomp] as a single-range (file_type 1) gkylzero file
+
+    The inverse of read_header/open_frame, for synthetic test and
+    calibration frames. float32 values are written as real_type 1.
+    """
+    values = np.asarray(values)
+    dtype = np.dtype('<f4') if values.dtype == np.float32 else np.dtype('<f8')
+    cells = values.shape[:-1]
+    try:
+        import msgpack
+        meta = msgpack.packb({'time': time, 'frame': frame, 'polyOrder': 1, 'basisType': 'serendipity'})
+    except ImportError:
+        meta = b''
+    with open(path, 'wb') as fh:
+        fh.write(GKYL_MAGIC)
+        np.array([1, 1, len(meta)], dtype='<u8').tofile(fh)
+        fh.write(meta)
+        np.array([1 if dtype.itemsize == 4 else 2, len(cells)], dtype='<u8').tofile(fh)
+        np.array(cells, dtype='<u8').tofile(fh)
+        np.asarray(lower, dtype='<f8').tofile(fh)
+        np.asarray(upper, dtype='<f8').tofile(fh)
+        np.array([dtype.itemsize * values.shape[-1], np.prod(cells)], dtype='<u8').tofile(fh)
+        np.ascontiguousarray(values, dtype=dtype).tofile(fh)
+
+
+def _unpack_meta(meta_raw):
+    """Decode the msgpack metadata block (time, frame, polyOrder, ...)
+
+    Raises ValueError if a non-empty block cannot be decoded.
+    """
+    if not meta_raw:
+        return {}
+    try:
+        import msgpack
+    except ImportError:
+        raise ValueError("msgpack not installed: frame metadata (time) cannot be read")
+    try:
+        meta = msgpack.unpackb(meta_raw, raw=False)
+    except Exception as err:
+        raise ValueError(f"undecodable metadata block: {err}")
+    if not isinstance(meta, dict):
+        raise ValueError(f"metadata block is a {type(meta).__name__}, not a map")
+    return meta
+
+
+def import_postgkyl():
+    """postgkyl, from its source checkout at POSTGKYL_PATH if it is not installed"""
+    if POSTGKYL_PATH not in sys.path:
+        sys.path.insert(0, POSTGKYL_PATH)
+    import postgkyl
+    return postgkyl
+
+
+def open_frame(path, header=None):
+    """Memory-map a frame as an array of shape cells + (ncomp,)"""
+    if header is None:
+        header = read_header(path)
+    if header['file_type'] != 1:
+        raise ValueError(f"{path}: file_type {header['file_type']} cannot be memory-mapped")
+
+    values = np.memmap(path, dtype=header['dtype'], mode='r', offset=header['offset'],
+                       shape=header['cells'] + (header['ncomp'],))
+    return header, values
+
+
+def load_frame(path):
+    """Return (header, values) using the memmap when possible, else postgkyl"""
+    try:
+        return open_frame(path)
+    except ValueError:
+        pg = import_postgkyl()
+        data = pg.data.GData(str(path))
+        bounds = data.get_bounds()
+        values = data.get_values()
+        header = {
+            'path': str(path),
+            'file_type': None,
+            'meta': dict(data.ctx),
+            'meta_error': None,
+            'time': data.ctx.get('time'),
+            'dtype': values.dtype,
+            'ndim': len(data.get_num_cells()),
+            'cells': tuple(int(c) for c in data.get_num_cells()),
+            'lower': np.asarray(bounds[0], dtype=float),
+            'upper': np.asarray(bounds[1], dtype=float),
+            'ncomp': values.shape[-1] if values.ndim > len(data.get_num_cells()) else 1,
+        }
+        if values.ndim == header['ndim']:
+            values = values[..., np.newaxis]
+        return header, values
+
+
+def frame_number(path):
+    """Frame index N from a '..._N.gkyl' file name"""
+    match = FRAME_NUMBER.search(str(path))
+    if match is None:
+        raise ValueError(f"{path}: no frame number in file name")
+    return int(match.group(1))
+
+
+def find_frames(pattern='gkeyll_papers_3_5_PRODUCTION_v3-elc_[0-9]*.gkyl'):
+    """Distribution-function frames matching pattern, in frame order"""
+    return sorted(glob.glob(pattern), key=frame_number)
+
+
+def velocity_grid(header):
+    """Cell-centre velocity meshgrids (VX, VY, VZ) and cell volume dv"""
+    lower, upper, cells = header['lower'], header['upper'], header['cells']
+
+    axes = []
+    dv = 1.0
+    for d in (3, 4, 5):
+        dvd = (upper[d] - lower[d]) / cells[d]
+        axes.append(np.linspace(lower[d] + dvd/2, upper[d] - dvd/2, cells[d]))
+        dv *= dvd
+
+    VX, VY, VZ = np.meshgrid(*axes, indexing='ij')
+    return VX, VY, VZ, dv
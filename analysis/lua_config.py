@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Read numeric parameters from a Gkeyll Lua input file
+
+Only top-level assignments are evaluated, in file order, so derived
+values such as T_par_init or vmax resolve against the ones before them.
+Lua syntax handled: `local`, multiple assignment (`a, b = 1, 2`), `--`
+comments, `^`, `math.sqrt`, `math.pi` and `pi`. Anything that does not
+evaluate to a number (tables, functions, strings) is skipped.
+"""
+
+import re
+import math
+
+ASSIGNMENT = re.compile(r'^(?:local\s+)?([A-Za-z_]\w*(?:\s*,\s*[A-Za-z_]\w*)*)\s*=\s*(.+)$')
+
+_MATH = type('LuaMath', (), {
+    'sqrt': staticmethod(math.sqrt), 'exp': staticmethod(math.exp),
+    'log': staticmethod(math.log), 'floor': staticmethod(math.floor),
+    'pi': math.pi,
+})
+
+
+def _split_top_level(expr):
+    """Split 'a, f(b, c)' on commas outside parentheses"""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(expr):
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+
+def _evaluate(expr, params):
+    """Evaluate a Lua arithmetic expression against params, or None"""
+    if any(tok in expr for tok in ('{', '"', "'", 'function', '..')):
+        return None
+    py = expr.replace('^', '**')
+    namespace = dict(params)
+    namespace['math'] = _MATH
+    try:
+        value = eval(py, {'__builtins__': {}}, namespace)
+    except Exception:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def read_lua_parameters(path):
+    """Numeric top-level assignments of a Lua input file, as a dict"""
+    params = {'pi': math.pi}
+    with open(path) as fh:
+        for line in fh:
+            code = line.split('--', 1)[0].strip()
+            if line.startswith((' ', '\t')) or not code:
+                continue
+            match = ASSIGNMENT.match(code)
+            if match is None:
+                continue
+            names = [n.strip() for n in match.group(1).split(',')]
+            exprs = _split_top_level(match.group(2))
+            if len(exprs) != len(names):
+                continue
+            for name, expr in zip(names, exprs):
+                value = _evaluate(expr, params)
+                if value is not None:
+                    params[name] = value
+    return params
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Quick-look estimate of σ(v∥), σ(v⊥) and Δ_σ from a sample of spatial cells
+
+The "is σ(v∥) evolving by more than 0.1%?" decision only needs a noisy
+answer. Instead of two full passes over gigabyte-scale frames, spatial
+cells are read from memory-mapped frames in a random (or stratified)
+order, the same cells in both frames. After every batch a paired
+bootstrap gives confidence intervals, and reading stops as soon as the
+interval for the σ(v∥) change is clear of the threshold. Batches grow
+geometrically (×BATCH_GROWTH), so the number of bootstrap rounds grows
+only logarithmically with the number of cells read.
+
+Δ_σ uses the convention of the README numbers: Δ_σ = (σ⊥² - σ∥²) / (2 σ∥²)
+with σ⊥² = <vx² + vy²>. This is not the pressure anisotropy
+(P⊥ - P∥) / (2 P∥), P⊥ = (Pxx + Pyy)/2, of relaxation_maps and
+analyze.py delta. An isotropic Maxwellian has Δ_σ = +0.5 but pressure Δ = 0.
+
+Usage:
+    python quicklook_sigma.py first.gkyl last.gkyl [--threshold 0.1]
+"""
+
+import argparse
+import numpy as np
+
+from gkyl_frames import load_frame, velocity_grid
+
+BATCH_GROWTH = 1.5
+
+
+def cell_sigmas(f_cells, VX, VY, VZ):
+    """σ(v∥), σ(v⊥) for a batch of spatial cells f_cells[n, Nvx, Nvy, Nvz]
+
+    Same per-cell moments as compute_velocity_widths (the cell volume dv
+    cancels in every ratio).
+    """
+    f_cells = np.asarray(f_cells, dtype=np.float64)
+    n = np.sum(f_cells, axis=(1,2,3)) + 1e-30
+
+    v_par_mean = np.tensordot(f_cells, VZ, axes=3) / n
+    v_par_sq = np.tensordot(f_cells, VZ**2, axes=3) / n
+    v_par_std = np.sqrt(np.maximum(0, v_par_sq - v_par_mean**2))
+
+    v_perp_sq = np.tensordot(f_cells, VX**2 + VY**2, axes=3) / n
+    v_perp_std = np.sqrt(v_perp_sq)
+
+    return v_par_std, v_perp_std
+
+
+def anisotropy(sigma_par, sigma_perp):
+    """Δ_σ = (σ⊥² - σ∥²) / (2 σ∥²), not the pressure Δ of relaxation_maps"""
+    return (sigma_perp**2 - sigma_par**2) / (2 * sigma_par**2)
+
+
+def sample_order(spatial_cells, strategy='stratified', seed=0):
+    """Order in which to visit spatial cells (flat indices)
+
+    'random' is a plain permutation. 'stratified' splits the box into
+    2×2×2 octants and interleaves a permutation of each octant, so every
+    prefix of the order covers the box evenly.
+    """
+    rng = np.random.default_rng(seed)
+    n_cells = int(np.prod(spatial_cells))
+
+    if strategy == 'random':
+        return rng.permutation(n_cells)
+    if strategy != 'stratified':
+        raise ValueError(f"unknown sampling strategy: {strategy}")
+
+    ii, jj, kk = np.unravel_index(np.arange(n_cells), spatial_cells)
+    nx, ny, nz = spatial_cells
+    stratum = (2*ii // nx) * 4 + (2*jj // ny) * 2 + (2*kk // nz)
+
+    strata = [rng.permutation(np.flatnonzero(stratum == s)) for s in np.unique(stratum)]
+    order = []
+    for rank in range(max(len(s) for s in strata)):
+        for s in rng.permutation(len(strata)):
+            if rank < len(strata[s]):
+                order.append(strata[s][rank])
+    return np.array(order)
+
+
+def bootstrap_ci(par_0, perp_0, par_N, perp_N, population, n_boot=2000, level=0.95, seed=0):
+    """Paired bootstrap over the sampled cells
+
+    Returns point estimates and (lo, hi) intervals for σ(v∥), σ(v⊥), Δ_σ of
+    both frames and for the percent change of σ(v∥). Once every cell of
+    the population has been read the estimate is exact and the intervals
+    collapse to the point value.
+    """
+    def stats(idx):
+        s0, p0 = par_0[idx].mean(axis=-1), perp_0[idx].mean(axis=-1)
+        sN, pN = par_N[idx].mean(axis=-1), perp_N[idx].mean(axis=-1)
+        return {
+            'sigma_par_0': s0, 'sigma_perp_0': p0, 'delta_0': anisotropy(s0, p0),
+            'sigma_par_N': sN, 'sigma_perp_N': pN, 'delta_N': anisotropy(sN, pN),
+            'percent_change': 100 * (sN - s0) / s0,
+        }
+
+    n = len(par_0)
+    point = stats(np.arange(n))
+
+    if n >= population:
+        return {key: (val, (val, val)) for key, val in point.items()}
+
+    rng = np.random.default_rng(seed)
+    boot = stats(rng.integers(0, n, size=(n_boot, n)))
+
+    alpha = (1 - level) / 2
+    return {key: (point[key], tuple(np.quantile(boot[key], [alpha, 1 - alpha])))
+            for key in point}
+
+
+def verdict(interval, threshold):
+    """'evolving', 'frozen' or None (interval still straddles ±threshold)"""
+    lo, hi = interval
+    if lo > threshold or hi < -threshold:
+        return 'evolving'
+    if -threshold < lo and hi < threshold:
+        return 'frozen'
+    return None
+
+
+def quick_look(first_path, last_path, threshold=0.1, batch=16, level=0.95,
+               n_boot=2000, strategy='stratified', seed=0, verbose=True):
+    """Progressively sample both frames until the σ(v∥) change is decided"""
+    head_0, values_0 = load_frame(first_path)
+    head_N, values_N = load_frame(last_path)
+
+    if head_0['cells'] != head_N['cells']:
+        raise ValueError("frames are on different grids")
+
+    spatial = head_0['cells'][:3]
+    population = int(np.prod(spatial))
+    VX, VY, VZ, dv = velocity_grid(head_0)
+    order = sample_order(spatial, strategy=strategy, seed=seed)
+
+    sampled = {'par_0': [], 'perp_0': [], 'par_N': [], 'perp_N': []}
+    result = None
+
+    start = 0
+    while start < population:
+        idx = np.sort(order[start:start + batch])
+        start += len(idx)
+        batch = int(np.ceil(batch * BATCH_GROWTH))
+        i, j, k = np.unravel_index(idx, spatial)
+
+        par, perp = cell_sigmas(values_0[i, j, k, ..., 0], VX, VY, VZ)
+        sampled['par_0'].append(par)
+        sampled['perp_0'].append(perp)
+        par, perp = cell_sigmas(values_N[i, j, k, ..., 0], VX, VY, VZ)
+        sampled['par_N'].append(par)
+        sampled['perp_N'].append(perp)
+
+        arrays = {key: np.concatenate(val) for key, val in sampled.items()}
+        n_read = len(arrays['par_0'])
+        ci = bootstrap_ci(arrays['par_0'], arrays['perp_0'], arrays['par_N'], arrays['perp_N'],
+                          population, n_boot=n_boot, level=level, seed=seed)
+
+        change, (lo, hi) = ci['percent_change']
+        decided = verdict((lo, hi), threshold)
+        if n_read >= population and decided is None:
+            decided = 'evolving' if abs(change) > threshold else 'frozen'
+
+        if verbose:
+            print(f"  {n_read:5d}/{population} cells: Δσ(v∥) = {change:+.3f}% "
+                  f"[{lo:+.3f}, {hi:+.3f}] ({100*level:.0f}% CI)")
+
+        result = {
+            'n_cells': n_read,
+            'population': population,
+            'time_0': head_0['time'],
+            'time_N': head_N['time'],
+            'ci': ci,
+            'verdict': decided,
+        }
+        if decided is not None:
+            break
+
+    return result
+
+
+def print_summary(result, level=0.95):
+    """Print sampled estimates with their confidence intervals"""
+    ci = result['ci']
+    print()
+    print(f"Estimated from {result['n_cells']}/{result['population']} spatial cells "
+          f"({100*level:.0f}% bootstrap CI):")
+    for frame, t in (('0', result['time_0']), ('N', result['time_N'])):
+        label = 'first' if frame == '0' else 'last '
+        t_str = f"t={t:.1f}" if t is not None else "t=?"
+        parts = []
+        for name, key in (('σ(v∥)', 'sigma_par_'), ('σ(v⊥)', 'sigma_perp_'), ('Δ_σ', 'delta_')):
+            val, (lo, hi) = ci[key + frame]
+            parts.append(f"{name}={val:.4f} [{lo:.4f}, {hi:.4f}]")
+        print(f"  {label} ({t_str}): " + ", ".join(parts))
+
+    val, (lo, hi) = ci['percent_change']
+    print(f"  Change: Δσ(v∥) = {val:+.3f}% [{lo:+.3f}, {hi:+.3f}]")
+    print("  (Δ_σ = (σ⊥² - σ∥²)/(2σ∥²); analyze.py delta reports the pressure Δ = (P⊥ - P∥)/(2P∥))")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('first', help='first distribution-function frame (.gkyl)')
+    parser.add_argument('last', help='last distribution-function frame (.gkyl)')
+    parser.add_argument('--threshold', type=float, default=0.1, help='σ(v∥) change threshold in %%')
+    parser.add_argument('--batch', type=int, default=16, help='cells read in the first refinement step')
+    parser.add_argument('--level', type=float, default=0.95, help='confidence level')
+    parser.add_argument('--strategy', choices=['stratified', 'random'], default='stratified')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    result = quick_look(args.first, args.last, threshold=args.threshold, batch=args.batch,
+                        level=args.level, strategy=args.strategy, seed=args.seed)
+    print_summary(result, level=args.level)
+    print()
+    print(f"VERDICT: {result['verdict'].upper()} (threshold {args.threshold}%)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Per-cell anisotropy relaxation-time maps
+
+Extracts Δ(x,y,z,t) from the M0/M1i/M2ij moment files of every frame
+and fits
+
+    Δ(t) = Δ∞ + A exp(-(t - t0) / τ)
+
+in all spatial cells at once with vectorized, damped Gauss-Newton
+(Levenberg-Marquardt) iterations. Output is τ(x,y,z) and Δ∞(x,y,z) with
+their 1σ uncertainties, so one can see whether relaxation is uniform or
+tracks the turbulent density perturbations.
+
+Δ follows the data README recipe for the pressure tensor,
+Δ = (P⊥ - P∥) / (2 P∥) with P⊥ = (Pxx + Pyy)/2 and P∥ = Pzz, where
+P = M2 - M1 M1 / M0 when the M1i files are present.
+
+Usage:
+    python relaxation_maps.py [RUN_DIR] [-o relaxation_maps.npz]
+"""
+
+import argparse
+import numpy as np
+
+from moment_spectra import M2IJ_COMPONENTS, load_moment_stack
+from run_catalog import update_catalog, frame_table, record_batch
+
+# index of (i, j) in the packed M2ij components
+M2IJ_INDEX = {(c[0], c[1]): n for n, c in enumerate(M2IJ_COMPONENTS)}
+M2IJ_INDEX.update({(c[1], c[0]): n for n, c in enumerate(M2IJ_COMPONENTS)})
+
+
+def pressure_tensor_stack(run_dir, rows):
+    """Pressure tensor P[frame, x, y, z, 3, 3] from the moment files"""
+    m2 = load_moment_stack(run_dir, rows, 'M2ij', n_components=len(M2IJ_COMPONENTS))
+    P = np.empty(m2.shape[:-1] + (3, 3))
+    for a, ca in enumerate('xyz'):
+        for b, cb in enumerate('xyz'):
+            P[..., a, b] = m2[..., M2IJ_INDEX[(ca, cb)]]
+
+    if all('M1i' in row['moments'] and 'M0' in row['moments'] for row in rows):
+        n = load_moment_stack(run_dir, rows, 'M0')[..., 0]
+        m1 = load_moment_stack(run_dir, rows, 'M1i', n_components=3)
+        P -= m1[..., :, None] * m1[..., None, :] / (n[..., None, None] + 1e-30)
+    return P
+
+
+def anisotropy(P_perp, P_par):
+    """Δ = (P⊥ - P∥) / (2 P∥)"""
+    return (P_perp - P_par) / (2 * P_par)
+
+
+def delta_cube(run_dir, prefix=None, species='elc'):
+    """Δ[frame, x, y, z] (z-aligned) and frame times for all cataloged frames
+
+    Frames without a known time cannot be placed on the time axis and are
+    left out with a warning.
+    """
+    catalog = update_catalog(run_dir)
+    rows = [row for row in frame_table(catalog, species=species, prefix=prefix)
+            if 'M2ij' in row['moments']]
+    unknown = [row['frame'] for row in rows if row['time'] is None]
+    if unknown:
+        print(f"⚠ Frames {unknown} have no time and are left out of the fit")
+        rows = [row for row in rows if row['time'] is not None]
+    if not rows:
+        raise ValueError(f"{run_dir}: no M2ij moment files with a known time")
+
+    P = pressure_tensor_stack(run_dir, rows)
+    P_perp = (P[..., 0, 0] + P[..., 1, 1]) / 2
+    P_par = P[..., 2, 2]
+    times = np.array([row['time'] for row in rows], dtype=np.float64)
+    return anisotropy(P_perp, P_par), times, rows
+
+
+def delta_series(run_dir, prefix=None, species='elc'):
+    """Volume-averaged Δ(t) from the averaged pressures, cached in the run catalog"""
+    catalog = update_catalog(run_dir)
+    rows = [row for row in frame_table(catalog, species=species, prefix=prefix)
+            if 'M2ij' in row['moments']]
+    if not rows:
+        raise ValueError(f"{run_dir}: no M2ij moment files")
+
+    P = pressure_tensor_stack(run_dir, rows).mean(axis=(1, 2, 3))
+    delta = anisotropy((P[:, 0, 0] + P[:, 1, 1]) / 2, P[:, 2, 2])
+    record_batch(run_dir, {row['frame']: {'delta': value} for row, value in zip(rows, delta)},
+                 species=species, catalog=catalog, prefix=rows[0]['prefix'])
+
+    times = np.array([np.nan if row['time'] is None else row['time'] for row in rows])
+    return times, delta
+
+
+def fit_relaxation(t, delta, n_iter=50, tol=1e-10):
+    """Fit Δ∞ + A exp(-(t - t0) λ) to every series delta[..., time] at once
+
+    Returns a dict of maps (same leading shape as delta): tau, tau_err,
+    delta_inf, delta_inf_err, amplitude, rms, converged (relative SSR
+    change below tol) and stalled (damping exhausted before converging).
+    """
+    t = np.asarray(t, dtype=np.float64)
+    if not np.all(np.isfinite(t)):
+        raise ValueError("fit_relaxation: frame times must all be known (no NaN)")
+    shape = delta.shape[:-1]
+    y = np.asarray(delta, dtype=np.float64).reshape(-1, len(t))
+    s = t - t[0]
+    n_series, n_t = y.shape
+
+    def model(theta):
+        e = np.exp(-np.outer(theta[:, 2], s))
+        return theta[:, :1] + theta[:, 1:2] * e, e
+
+    def jacobian(theta, e):
+        J = np.empty((n_series, n_t, 3))
+        J[..., 0] = 1.0
+        J[..., 1] = e
+        J[..., 2] = -theta[:, 1:2] * s * e
+        return J
+
+    # start from λ = 1/span with the linear parameters solved exactly
+    theta = np.zeros((n_series, 3))
+    theta[:, 2] = 1.0 / s[-1]
+    e0 = np.exp(-theta[0, 2] * s)
+    basis = np.stack([np.ones_like(s), e0], axis=1)
+    theta[:, :2] = np.linalg.lstsq(basis, y.T, rcond=None)[0].T
+
+    f, e = model(theta)
+    ssr = np.sum((y - f)**2, axis=1)
+    mu = np.full(n_series, 1e-3)
+    converged = np.zeros(n_series, dtype=bool)
+    stalled = np.zeros(n_series, dtype=bool)
+
+    for _ in range(n_iter):
+        J = jacobian(theta, e)
+        r = y - f
+        JTJ = np.einsum('nti,ntj->nij', J, J)
+        JTr = np.einsum('nti,nt->ni', J, r)
+        diag = np.diagonal(JTJ, axis1=1, axis2=2) + 1e-12
+        damped = JTJ + np.eye(3) * (mu[:, None] * diag)[:, :, None]
+        step = np.linalg.solve(damped, JTr[..., None])[..., 0]
+
+        trial = theta + step
+        trial[:, 2] = np.maximum(trial[:, 2], 1e-12)
+        f_trial, e_trial = model(trial)
+        ssr_trial = np.sum((y - f_trial)**2, axis=1)
+
+        active = ~(converged | stalled)
+        better = (ssr_trial <= ssr) & active
+        rel = np.abs(ssr - ssr_trial) / (ssr + 1e-300)
+        converged |= better & (rel < tol)
+
+        theta[better] = trial[better]
+        f[better], e[better], ssr[better] = f_trial[better], e_trial[better], ssr_trial[better]
+        mu = np.where(better, mu / 3, mu * 4)
+        stalled |= (mu > 1e8) & ~converged  # no step improves any more
+        if (converged | stalled).all():
+            break
+
+    J = jacobian(theta, e)
+    JTJ = np.einsum('nti,ntj->nij', J, J)
+    dof = max(n_t - 3, 1)
+    cov = np.linalg.pinv(JTJ) * (ssr / dof)[:, None, None]
+    err = np.sqrt(np.maximum(np.diagonal(cov, axis1=1, axis2=2), 0))
+
+    lam = theta[:, 2]
+    return {
+        'tau': (1 / lam).reshape(shape),
+        'tau_err': (err[:, 2] / lam**2).reshape(shape),
+        'delta_inf': theta[:, 0].reshape(shape),
+        'delta_inf_err': err[:, 0].reshape(shape),
+        'amplitude': theta[:, 1].reshape(shape),
+        'rms': np.sqrt(ssr / n_t).reshape(shape),
+        'converged': converged.reshape(shape),
+        'stalled': stalled.reshape(shape),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-cell Δ relaxation-time maps")
+    parser.add_argument('run_dir', nargs='?', default='.')
+    parser.add_argument('--prefix', help='run prefix when several runs share a directory')
+    parser.add_argument('-o', '--output', default='relaxation_maps.npz')
+    args = parser.parse_args()
+
+    delta, times, rows = delta_cube(args.run_dir, prefix=args.prefix)
+    fit = fit_relaxation(times, np.moveaxis(delta, 0, -1))
+
+    density_0 = load_moment_stack(args.run_dir, rows[:1], 'M0')[0, ..., 0] \
+        if 'M0' in rows[0]['moments'] else None
+
+    np.savez(args.output, times=times, delta=delta.astype(np.float32), **fit)
+
+    tau = fit['tau']
+    ok = fit['converged']
+    print(f"Fitted {tau.size} cells over {len(times)} frames -> {args.output}")
+    print(f"  converged: {ok.sum()}/{ok.size}, stalled: {fit['stalled'].sum()}, "
+          f"iteration limit: {ok.size - ok.sum() - fit['stalled'].sum()}")
+    print(f"  τ:  median {np.median(tau):.2f}, IQR [{np.percentile(tau, 25):.2f}, {np.percentile(tau, 75):.2f}]")
+    print(f"  Δ∞: median {np.median(fit['delta_inf']):+.3f} "
+          f"(median 1σ {np.median(fit['delta_inf_err']):.3f})")
+    if density_0 is not None:
+        corr = np.corrcoef(density_0.ravel(), tau.ravel())[0, 1]
+        print(f"  corr(δn(t0), τ) = {corr:+.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Output size, analysis memory and analysis time for a run configuration
+
+Reads a Gkeyll Lua input (through lua_config) or a Stella namelist (.in)
+and predicts, before the run is launched:
+
+  - bytes per output frame and for the whole run
+  - memory of the streamed frame analysis (frame_entropy.frame_diagnostics:
+    σ(v∥), σ(v⊥), S_B, S_LB) per worker, for a given slab size
+  - analysis wall time, with the per-cell cost of the repository's own
+    reduction kernels measured on this machine (a synthetic frame with the
+    run's velocity grid goes through frame_kernels.reduce_frame with the
+    backend frame_diagnostics would use, single-threaded, i.e. per core)
+    and disk reads at --read-bandwidth, or measured from --frame
+  - number of concurrent workers (process pool or work_queue.py) and the
+    slab size to use on the target machine (--cores, --memory)
+
+Gkeyll frames: a p-th order DG field on N cells with K basis functions
+and C components is N·K·C doubles plus a short header; every frame has
+the 6D distribution, the 3D field (8 components) and one file per
+diagnostic moment listed in the input. Stella: one .out.nc record per
+nwrite steps (|φ|² and fluxes per kx, ky; φ and moments along z) plus
+the restart distribution.
+
+Usage:
+    python resource_estimate.py ../simulations/v3_collision_operator/gkeyll_v3_production.lua
+    python resource_estimate.py INPUT.lua --cores 32 --memory 128 --read-bandwidth 2
+    python resource_estimate.py ../paper-6-gyrokinetic-validation/input_files/*.in
+"""
+
+import os
+import re
+import math
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from lua_config import read_lua_parameters
+
+GB = 1e9
+META_BYTES = 100             # msgpack time/frame/basis block of a .gkyl header
+FIELD_COMPONENTS = 8
+MOMENT_COMPONENTS = {'M0': 1, 'M1i': 3, 'M2': 1, 'M2ij': 6, 'M3i': 3}
+DEFAULT_LEVELS = (1, 2, 3)
+DEFAULT_READ_BANDWIDTH = 0.5   # GB/s per node, typical of a shared filesystem
+SLAB_TARGET = 256e6          # bytes of transient data per streamed slab
+MEMORY_FRACTION = 0.75       # share of the node memory given to analysis workers
+CALIBRATION_CELLS = 2_000_000
+SLAB_BYTES_PER_CELL = {'float64': 33, 'float32': 21}
+
+
+def serendipity_basis_size(ndim, poly_order):
+    """Number of serendipity basis functions (Arnold & Awanou 2011)"""
+    return sum(2**(ndim - j) * math.comb(ndim, j) * math.comb(poly_order - j, j)
+               for j in range(min(ndim, poly_order // 2) + 1))
+
+
+def basis_size(ndim, poly_order, basis='serendipity'):
+    if basis == 'tensor':
+        return (poly_order + 1)**ndim
+    return serendipity_basis_size(ndim, poly_order)
+
+
+def gkyl_file_bytes(cells, n_basis, n_components=1):
+    """Size of one .gkyl file: header plus N·K·C doubles"""
+    header = 5 + 3 * 8 + META_BYTES + 2 * 8 + 3 * 8 * len(cells) + 2 * 8
+    return header + int(np.prod(cells)) * n_basis * n_components * 8
+
+
+def gkeyll_config(path):
+    """Grid, basis, frame count and diagnostics of a Gkeyll Lua input"""
+    params = read_lua_parameters(path)
+    with open(path) as fh:
+        text = fh.read()
+
+    def lookup(*names):
+        for name in names:
+            if name in params:
+                return int(params[name])
+        raise ValueError(f"{path}: none of {names} assigned at top level")
+
+    cells_x = (lookup('Nx'), lookup('Ny', 'Nx'), lookup('Nz', 'Nx'))
+    cells_v = (lookup('Nvx', 'Nv'), lookup('Nvy', 'Nv'), lookup('Nvz', 'Nv'))
+
+    poly_order = params.get('poly_order', params.get('polyOrder'))
+    if poly_order is None:
+        match = re.search(r'polyOrder\s*=\s*(\d+)', text)
+        poly_order = int(match.group(1)) if match else 1
+    match = re.search(r'basis(?:_type)?\s*=\s*"(\w+)"', text)
+    basis = match.group(1) if match else 'serendipity'
+
+    n_frames = lookup('nFrame', 'num_frames') + 1     # frame 0 is written too
+    moments = re.findall(r'G0\.Moment\.(\w+)', text)
+
+    return {
+        'kind': 'gkeyll',
+        'path': str(path),
+        'cells_x': cells_x,
+        'cells_v': cells_v,
+        'poly_order': int(poly_order),
+        'basis': basis,
+        'n_frames': n_frames,
+        't_end': params.get('tEnd', params.get('t_end')),
+        'moments': moments,
+    }
+
+
+def read_namelist(path):
+    """Fortran namelist groups of a Stella input as {group: {key: value}}"""
+    groups, current = {}, None
+    with open(path) as fh:
+        for line in fh:
+            code = line.split('!', 1)[0].strip()
+            if not code:
+                continue
+            if code.startswith('&'):
+                current = groups.setdefault(code[1:].strip().lower(), {})
+            elif code == '/':
+                current = None
+            elif current is not None and '=' in code:
+                key, value = (s.strip() for s in code.split('=', 1))
+                current[key.lower()] = _namelist_value(value)
+    return groups
+
+
+def _namelist_value(value):
+    if value.lower() in ('.true.', 't'):
+        return True
+    if value.lower() in ('.false.', 'f'):
+        return False
+    if value[:1] in '\'"':
+        return value.strip('\'"')
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value.lower().replace('d', 'e'))
+    except ValueError:
+        return value
+
+
+def stella_config(path):
+    """Grid sizes, steps and output cadence of a Stella input"""
+    flat = {}
+    for group in read_namelist(path).values():
+        flat.update(group)
+
+    def get(key, default):
+        return flat.get(key, default)
+
+    nx, ny = get('nx', 1), get('ny', 1)
+    nzed, nperiod = get('nzed', 24), get('nperiod', 1)
+    nstep, nwrite = get('nstep', 1), get('nwrite', 50)
+    return {
+        'kind': 'stella',
+        'path': str(path),
+        'nakx': 2 * ((nx - 1) // 3) + 1,       # dealiased Fourier modes kept by stella
+        'naky': (ny - 1) // 3 + 1,
+        'nztot': nzed * (2 * nperiod - 1) + 1,
+        'nvpa': 2 * get('nvgrid', 24),
+        'nmu': get('nmu', 12),
+        'nspec': get('nspec', 1),
+        'nstep': nstep,
+        'delt': get('delt', None),
+        'n_records': nstep // nwrite + 1,
+        'flags': {key: flat.get(key, False) for key in
+                  ('write_phi_vs_time', 'write_fluxes_kxky', 'write_moments', 'write_omega',
+                   'save_for_restart')},
+    }
+
+
+def gkeyll_output(config):
+    """Bytes per frame for the distribution, field and each moment file"""
+    n_basis_6d = basis_size(6, config['poly_order'], config['basis'])
+    n_basis_3d = basis_size(3, config['poly_order'], config['basis'])
+    files = {'dist': gkyl_file_bytes(config['cells_x'] + config['cells_v'], n_basis_6d),
+             'field': gkyl_file_bytes(config['cells_x'], n_basis_3d, FIELD_COMPONENTS)}
+    for moment in config['moments']:
+        files[moment] = gkyl_file_bytes(config['cells_x'], n_basis_3d, MOMENT_COMPONENTS.get(moment, 1))
+    per_frame = sum(files.values())
+    return {'files': files, 'per_frame': per_frame, 'total': per_frame * config['n_frames']}
+
+
+def stella_output(config):
+    """Bytes per .out.nc record, the whole output file and the restart file"""
+    kxky = config['nakx'] * config['naky']
+    nspec, nztot = config['nspec'], config['nztot']
+    flags = config['flags']
+
+    record = 8 + 3 * nspec * 8                          # time, scalar fluxes
+    if flags['write_phi_vs_time']:
+        record += 2 * kxky * nztot * 8                  # complex φ(kx, ky, z)
+    if flags['write_fluxes_kxky']:
+        record += 3 * nspec * kxky * 8
+    if flags['write_moments']:
+        record += 3 * nspec * 2 * kxky * nztot * 8      # density, upar, temperature
+    if flags['write_omega']:
+        record += 2 * kxky * 8
+
+    restart = 0
+    if flags['save_for_restart']:
+        restart = 16 * kxky * nztot * config['nvpa'] * config['nmu'] * nspec
+    return {'per_record': record, 'total': record * config['n_records'] + restart,
+            'restart': restart, 'phi_in_memory': 2 * kxky * nztot * 8 * config['n_records']}
+
+
+def slab_bytes_per_cell(backend='numpy', precision='float64', levels=DEFAULT_LEVELS):
+    """Transient bytes per streamed phase-space cell of a frame_kernels backend
+
+    NumPy: the contiguous copy of coefficient 0 plus the S_B temporaries
+    (SLAB_BYTES_PER_CELL, measured with tracemalloc). numba reads the
+    memmap in place; only the slab's coarse-grained block sums are written.
+    """
+    if backend == 'numba':
+        return 8 * sum(1 / c**3 for c in levels)
+    return SLAB_BYTES_PER_CELL[precision]
+
+
+def analysis_memory(config, slab=1, precision='float64', levels=DEFAULT_LEVELS, backend='numpy'):
+    """Peak bytes of one frame_diagnostics worker streaming slab x-planes at a time
+
+    Per streamed cell: slab_bytes_per_cell. With NumPy the coarse-grained
+    blocks are kept until the end of the frame (η not known in advance),
+    where S_LB needs about seven more arrays the size of the finest level.
+    numba finds η in a first pass and reduces the blocks slab by slab, so
+    only the slab buffers and the moments remain.
+    """
+    nx, ny, nz = config['cells_x']
+    n_cells = nx * ny * nz * int(np.prod(config['cells_v']))
+
+    transient = min(slab, nx) * (n_cells // nx) * slab_bytes_per_cell(backend, precision, levels)
+    moments = nx * ny * nz * 4 * 8
+    if backend == 'numba':
+        return int(transient + moments)
+    stored = n_cells * 8 * sum(1 / c**3 for c in levels)
+    final = 7 * n_cells * 8 / min(levels)**3 if levels else 0
+    return int(stored + max(transient, final) + moments)
+
+
+def choose_slab(config, precision='float64', levels=DEFAULT_LEVELS, target=SLAB_TARGET,
+                backend='numpy'):
+    """Largest number of x-planes whose transient data stay under target bytes"""
+    nx = config['cells_x'][0]
+    plane = (int(np.prod(config['cells_x'][1:] + config['cells_v']))
+             * slab_bytes_per_cell(backend, precision, levels))
+    return max(1, min(nx, int(target // max(plane, 1))))
+
+
+def calibrate(config, precision='float64', levels=DEFAULT_LEVELS, frame=None):
+    """Measured seconds per phase-space cell of the frame reductions on this machine
+
+    A synthetic frame with the run's velocity grid (about CALIBRATION_CELLS
+    cells) is reduced by frame_kernels.reduce_frame with the backend that
+    frame_diagnostics resolves to, on one thread (numba included), after a
+    warm-up call that absorbs JIT compilation. With frame, a real .gkyl
+    file is also streamed through frame_diagnostics and its read rate
+    (GB/s, including page cache effects) is returned. Returns the backend,
+    seconds per cell and the read rate (or None).
+    """
+    from gkyl_frames import write_frame
+    from frame_kernels import numba, resolve_backend, reduce_frame
+
+    backend = resolve_backend(None, precision)
+    nvx, nvy, nvz = config['cells_v']
+    n_v = nvx * nvy * nvz
+    n_planes = max(1, CALIBRATION_CELLS // n_v)
+    dtype = np.float32 if precision == 'float32' else np.float64
+    rng = np.random.default_rng(0)
+    f = rng.random((1, 1, n_planes, nvx, nvy, nvz, 1)).astype(dtype)
+
+    # one thread, also for the --frame read measurement, so compute time is per core
+    threads = numba.get_num_threads() if numba is not None else None
+    if numba is not None:
+        numba.set_num_threads(1)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'calibration-elc_0.gkyl')
+            write_frame(path, f, [0, 0, 0, -3.0, -3.0, -3.0], [1, 1, 1, 3.0, 3.0, 3.0])
+            timings = []
+            for _ in range(4):
+                start = time.perf_counter()
+                reduce_frame(path, backend, levels=levels, precision=precision, pitch=False)
+                timings.append(time.perf_counter() - start)
+        seconds_per_cell = min(timings[1:]) / f.size
+
+        read_rate = None
+        if frame is not None:
+            from gkyl_frames import read_header
+            from frame_entropy import frame_diagnostics
+
+            start = time.perf_counter()
+            frame_diagnostics(frame, levels=levels, precision=precision, backend=backend)
+            elapsed = time.perf_counter() - start
+            n_cells = int(np.prod(read_header(frame)['cells']))
+            io = max(elapsed - seconds_per_cell * n_cells, 1e-9)
+            read_rate = os.path.getsize(frame) / io / GB
+    finally:
+        if numba is not None:
+            numba.set_num_threads(threads)
+    return backend, seconds_per_cell, read_rate
+
+
+def node_resources():
+    """CPU count and physical memory (bytes) of this machine"""
+    try:
+        memory = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        memory = None
+    return os.cpu_count() or 1, memory
+
+
+def plan_analysis(config, cores, memory, read_bandwidth, seconds_per_cell, precision='float64',
+                  levels=DEFAULT_LEVELS, backend='numpy'):
+    """Slab size, worker count and wall time for analysing every frame of a Gkeyll run
+
+    seconds_per_cell is the single-core cost; one worker per core (numba
+    workers are given cores // workers threads, see work_queue.launch_local).
+    """
+    output = gkeyll_output(config)
+    slab = choose_slab(config, precision, levels, backend=backend)
+    worker_memory = analysis_memory(config, slab, precision, levels, backend=backend)
+    n_frames = config['n_frames']
+    n_cells = int(np.prod(config['cells_x'] + config['cells_v']))
+
+    # every coefficient page is read: coefficient 0 is strided through the file
+    read_seconds = output['files']['dist'] / (read_bandwidth * GB)
+    compute_seconds = seconds_per_cell * n_cells
+
+    by_memory = max(1, int(memory * MEMORY_FRACTION // worker_memory)) if memory else cores
+    # beyond this many workers the shared read bandwidth is saturated
+    by_bandwidth = max(1, math.ceil((compute_seconds + read_seconds) / read_seconds))
+    workers = max(1, min(cores, by_memory, by_bandwidth, n_frames))
+
+    frames_per_second = min(workers / (compute_seconds + read_seconds), 1 / read_seconds)
+    return {
+        'slab': slab,
+        'worker_memory': worker_memory,
+        'workers': workers,
+        'limited_by': min((cores, 'cores'), (by_memory, 'memory'), (by_bandwidth, 'read bandwidth'),
+                          (n_frames, 'frame count'))[1],
+        'frame_seconds': compute_seconds + read_seconds,
+        'compute_seconds': compute_seconds,
+        'read_seconds': read_seconds,
+        'wall_seconds': n_frames / frames_per_second,
+    }
+
+
+def _size(n_bytes):
+    for unit, scale in (('GB', 1e9), ('MB', 1e6), ('kB', 1e3)):
+        if n_bytes >= scale:
+            return f"{n_bytes/scale:.2f} {unit}"
+    return f"{n_bytes} B"
+
+
+def _duration(seconds):
+    if seconds >= 3600:
+        return f"{seconds/3600:.1f} h"
+    if seconds >= 60:
+        return f"{seconds/60:.1f} min"
+    return f"{seconds:.2f} s"
+
+
+def print_gkeyll_estimate(config, cores=None, memory=None, read_bandwidth=DEFAULT_READ_BANDWIDTH,
+                          frame=None, precision='float64', levels=DEFAULT_LEVELS):
+    """Print output sizes and the analysis plan of a Gkeyll input (memory in bytes)"""
+    output = gkeyll_output(config)
+    n_cells = int(np.prod(config['cells_x'] + config['cells_v']))
+    print(f"  Grid: {'×'.join(map(str, config['cells_x']))} × {'×'.join(map(str, config['cells_v']))} "
+          f"= {n_cells:,} cells, {config['basis']} p={config['poly_order']} "
+          f"({basis_size(6, config['poly_order'], config['basis'])} basis functions)")
+    print(f"  Frames: {config['n_frames']}" + (f" (t = 0 to {config['t_end']:g})" if config['t_end'] else ''))
+    for name, size in output['files'].items():
+        print(f"    {name:6s} {_size(size):>10s} per frame")
+    print(f"  Output: {_size(output['per_frame'])} per frame, {_size(output['total'])} total")
+
+    levels = [c for c in levels if all(n % c == 0 for n in config['cells_v'])]
+    backend, seconds_per_cell, read_rate = calibrate(config, precision, levels, frame)
+    local_cores, local_memory = node_resources()
+    cores = cores or local_cores
+    memory = memory or local_memory
+    bandwidth = read_rate or read_bandwidth
+    plan = plan_analysis(config, cores, memory, bandwidth, seconds_per_cell,
+                         precision=precision, levels=levels, backend=backend)
+    print(f"  Analysis ({backend} kernels, {precision}, S_LB levels {levels}):")
+    print(f"    memory per worker: {_size(plan['worker_memory'])} with --slab {plan['slab']}")
+    print(f"    per frame: {_duration(plan['compute_seconds'])} compute "
+          f"({seconds_per_cell*1e9:.1f} ns/cell measured) + {_duration(plan['read_seconds'])} read "
+          f"at {bandwidth:.2f} GB/s")
+    print(f"    workers: {plan['workers']} of {cores} cores (limited by {plan['limited_by']})")
+    print(f"    wall time for all frames: {_duration(plan['wall_seconds'])}")
+
+
+def print_stella_estimate(config):
+    output = stella_output(config)
+    print(f"  Modes: {config['nakx']} kx × {config['naky']} ky, {config['nztot']} z points, "
+          f"{config['nvpa']} v∥ × {config['nmu']} μ, {config['nspec']} species")
+    span = f", t = 0 to {config['nstep']*config['delt']:g}" if config['delt'] else ''
+    print(f"  Steps: {config['nstep']}, {config['n_records']} output records{span}")
+    print(f"  Output: {_size(output['per_record'])} per record, {_size(output['total'])} total "
+          f"(restart {_size(output['restart'])})")
+    print(f"  Analysis: heat-flux series {_size(config['n_records']*8)}, "
+          f"φ(t) fully loaded {_size(output['phi_in_memory'])}")
+
+
+def add_estimate_arguments(parser):
+    """Arguments of the estimate CLI (also used by analyze.py estimate)"""
+    parser.add_argument('inputs', nargs='+', help='Gkeyll .lua or Stella .in input files')
+    parser.add_argument('--cores', type=int, help='cores on the analysis node (default: this machine)')
+    parser.add_argument('--memory', type=float, help='memory of the analysis node in GB (default: this machine)')
+    parser.add_argument('--read-bandwidth', type=float, default=DEFAULT_READ_BANDWIDTH,
+                        help='aggregate read bandwidth in GB/s')
+    parser.add_argument('--frame', help='existing .gkyl frame to measure the read rate from')
+    parser.add_argument('--precision', choices=('float64', 'float32'), default='float64')
+    parser.add_argument('--levels', type=int, nargs='*', default=list(DEFAULT_LEVELS),
+                        help='S_LB coarse-graining levels (none: moments only)')
+
+
+def run_estimates(args):
+    """Print the estimate of every input file in args (from add_estimate_arguments)"""
+    for path in args.inputs:
+        print(f"{path}:")
+        if path.endswith('.lua'):
+            print_gkeyll_estimate(gkeyll_config(path), cores=args.cores,
+                                  memory=args.memory * GB if args.memory else None,
+                                  read_bandwidth=args.read_bandwidth, frame=args.frame,
+                                  precision=args.precision, levels=args.levels)
+        else:
+            print_stella_estimate(stella_config(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate output size and analysis cost of a run")
+    add_estimate_arguments(parser)
+    run_estimates(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
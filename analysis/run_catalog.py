@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Run catalog: index of every .gkyl frame in a run directory
+
+Each run directory (v1, v2, v3 production) is scanned once and the
+catalog is written next to the data as run_catalog.json. For every file
+it records frame number, time, size, grid, species and moment kind, read
+from the header only. Re-indexing only touches files that are new or
+whose size/mtime changed, plus files whose header or time could not be
+read last time (entries with 'error', e.g. a frame still being written or
+metadata without msgpack), so a missing time is never cached. Per-frame
+analysis results (σ(v∥), σ(v⊥), ...) can be stored in the catalog too,
+so that multi-run comparisons and time-range queries never have to open
+a frame.
+
+Several runs may share a directory. Frames and results are kept apart by
+run prefix (results[species][prefix][frame]); queries without a prefix
+raise ValueError when the directory holds more than one run.
+
+Usage:
+    python run_catalog.py index v1_production/ v3_production/
+    python run_catalog.py frames v3_production/ --tmin 10 --tmax 50
+    python run_catalog.py compare v1_production/ v2_production/ v3_production/
+"""
+
+import os
+import re
+import json
+import argparse
+from pathlib import Path
+
+CATALOG_NAME = 'run_catalog.json'
+CATALOG_VERSION = 2
+
+# <prefix>-<species>_<N>.gkyl or <prefix>-<species>_<moment>_<N>.gkyl
+FILE_NAME = re.compile(r'^(?P<prefix>.+)-(?P<species>[A-Za-z0-9]+)'
+                       r'(?:_(?P<kind>[A-Za-z][A-Za-z0-9]*))?_(?P<frame>\d+)\.gkyl$')
+
+
+def parse_name(filename):
+    """Split a Gkeyll output name into prefix, species, kind and frame"""
+    match = FILE_NAME.match(os.path.basename(filename))
+    if match is None:
+        return None
+    return {
+        'prefix': match.group('prefix'),
+        'species': match.group('species'),
+        'kind': match.group('kind') or 'dist',
+        'frame': int(match.group('frame')),
+    }
+
+
+def load_catalog(run_dir):
+    """Read run_catalog.json from run_dir (empty catalog if absent)"""
+    path = Path(run_dir) / CATALOG_NAME
+    if path.exists():
+        with open(path) as fh:
+            catalog = json.load(fh)
+        if catalog.get('version') == CATALOG_VERSION:
+            return catalog
+        if catalog.get('version') == 1:
+            return _upgrade_v1(catalog)
+    return {'version': CATALOG_VERSION, 'run': Path(run_dir).resolve().name,
+            'files': {}, 'results': {}}
+
+
+def _upgrade_v1(catalog):
+    """Version 1 kept results per (species, frame); file them under the run prefix"""
+    results = {}
+    for species, per_frame in catalog.get('results', {}).items():
+        prefixes = _prefixes(catalog, species)
+        if len(prefixes) == 1:
+            results[species] = {prefixes[0]: per_frame}
+        elif per_frame:
+            print(f"⚠ {catalog['run']}: cached {species} results of several runs "
+                  f"({', '.join(prefixes)}) cannot be told apart and are dropped")
+    catalog.update({'version': CATALOG_VERSION, 'results': results})
+    return catalog
+
+
+def save_catalog(run_dir, catalog):
+    """Write the catalog atomically (tmp file + rename)"""
+    path = Path(run_dir) / CATALOG_NAME
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(catalog, fh, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _index_file(path, stat):
+    """Catalog entry for one file, from its name and header"""
+    entry = dict(parse_name(path.name))
+    entry['size'] = stat.st_size
+    entry['mtime'] = stat.st_mtime
+
+    # imported here so catalog queries start without numpy
+    from gkyl_frames import read_header
+    try:
+        header = read_header(path)
+    except (ValueError, OSError) as err:
+        entry['error'] = str(err)
+        entry['time'] = None
+        return entry
+
+    if header['meta_error']:
+        entry['error'] = header['meta_error']
+    entry['time'] = header['time']
+    entry['cells'] = list(header['cells'])
+    entry['lower'] = [float(x) for x in header['lower']]
+    entry['upper'] = [float(x) for x in header['upper']]
+    entry['ncomp'] = header['ncomp']
+    entry['dtype'] = header['dtype'].str
+    return entry
+
+
+def update_catalog(run_dir, verbose=False):
+    """Scan run_dir and bring its catalog up to date; returns the catalog"""
+    run_dir = Path(run_dir)
+    catalog = load_catalog(run_dir)
+    files = catalog['files']
+
+    seen = set()
+    changed = 0
+    for path in sorted(run_dir.glob('*.gkyl')):
+        if parse_name(path.name) is None:
+            continue
+        seen.add(path.name)
+        stat = path.stat()
+        old = files.get(path.name)
+        if (old is not None and 'error' not in old
+                and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime):
+            continue
+        files[path.name] = _index_file(path, stat)
+        if 'error' in files[path.name]:
+            print(f"⚠ {path.name}: {files[path.name]['error']} (re-indexed on next update)")
+        changed += 1
+
+    removed = [name for name in files if name not in seen]
+    for name in removed:
+        del files[name]
+
+    if changed or removed or not (run_dir / CATALOG_NAME).exists():
+        save_catalog(run_dir, catalog)
+    if verbose:
+        print(f"{run_dir}: {len(files)} files indexed ({changed} updated, {len(removed)} removed)")
+    return catalog
+
+
+def _prefixes(catalog, species):
+    return sorted({entry['prefix'] for entry in catalog['files'].values() if entry['species'] == species})
+
+
+def run_prefix(catalog, species='elc', prefix=None):
+    """prefix, or the only run prefix of species in the catalog (None if there are no files)
+
+    Raises ValueError if several runs share the directory and no prefix is given.
+    """
+    if prefix is not None:
+        return prefix
+    prefixes = _prefixes(catalog, species)
+    if len(prefixes) > 1:
+        raise ValueError(f"{catalog['run']}: several runs share this directory "
+                         f"({', '.join(prefixes)}); pass a prefix")
+    return prefixes[0] if prefixes else None
+
+
+def frame_table(catalog, species='elc', prefix=None):
+    """One row per frame of one run: number, time, grid, sizes and available moments"""
+    prefix = run_prefix(catalog, species, prefix)
+    frames = {}
+    for name, entry in catalog['files'].items():
+        if entry['species'] != species or entry['prefix'] != prefix:
+            continue
+        row = frames.setdefault(entry['frame'], {
+            'frame': entry['frame'], 'prefix': entry['prefix'], 'species': species,
+            'time': None, 'file': None, 'cells': None, 'size': 0, 'moments': {},
+        })
+        row['size'] += entry['size']
+        if entry['kind'] == 'dist':
+            row['file'] = name
+            row['cells'] = entry.get('cells')
+            if entry['time'] is not None:
+                row['time'] = entry['time']
+        else:
+            row['moments'][entry['kind']] = name
+            if row['time'] is None:
+                row['time'] = entry['time']
+
+    results = catalog.get('results', {}).get(species, {}).get(prefix, {})
+    for number, row in frames.items():
+        row['results'] = results.get(str(number), {})
+    return [frames[n] for n in sorted(frames)]
+
+
+def frames_in_range(catalog, t_min=None, t_max=None, species='elc', prefix=None):
+    """Frames with t_min <= time <= t_max
+
+    Without bounds every frame is returned; with a bound, frames with
+    unknown time are skipped.
+    """
+    rows = []
+    for row in frame_table(catalog, species=species, prefix=prefix):
+        t = row['time']
+        if t is None:
+            if t_min is None and t_max is None:
+                rows.append(row)
+            continue
+        if t_min is not None and t < t_min:
+            continue
+        if t_max is not None and t > t_max:
+            continue
+        rows.append(row)
+    return rows
+
+
+def record_results(run_dir, frame, results, species='elc', catalog=None, prefix=None):
+    """Store per-frame analysis results (plain floats) in the catalog"""
+    return record_batch(run_dir, {frame: results}, species=species, catalog=catalog, prefix=prefix)
+
+
+def record_batch(run_dir, results_by_frame, species='elc', catalog=None, prefix=None):
+    """record_results for many frames ({frame: results}) with a single catalog write"""
+    if catalog is None:
+        catalog = load_catalog(run_dir)
+    prefix = run_prefix(catalog, species, prefix)
+    per_frame = catalog.setdefault('results', {}).setdefault(species, {}).setdefault(prefix, {})
+    for frame, results in results_by_frame.items():
+        per_frame.setdefault(str(frame), {}).update({k: float(v) for k, v in results.items()})
+    save_catalog(run_dir, catalog)
+    return catalog
+
+
+def compare_runs(run_dirs, key='v_par_std', species='elc', prefix=None):
+    """First-to-last change of a stored result for each run, from the catalogs only"""
+    summary = []
+    for run_dir in run_dirs:
+        catalog = load_catalog(run_dir)
+        rows = [r for r in frame_table(catalog, species=species, prefix=prefix) if key in r['results']]
+        if len(rows) < 2:
+            summary.append({'run': catalog['run'], 'n_frames': len(rows)})
+            continue
+        first, last = rows[0], rows[-1]
+        v0, vN = first['results'][key], last['results'][key]
+        duration = None
+        if first['time'] is not None and last['time'] is not None:
+            duration = last['time'] - first['time']
+        summary.append({
+            'run': catalog['run'],
+            'n_frames': len(rows),
+            'first': v0,
+            'last': vN,
+            'percent_change': 100 * (vN - v0) / v0,
+            'duration': duration,
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index Gkeyll run directories")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_index = sub.add_parser('index', help='create or update catalogs')
+    p_index.add_argument('run_dirs', nargs='+')
+
+    p_frames = sub.add_parser('frames', help='list frames from a catalog')
+    p_frames.add_argument('run_dir')
+    p_frames.add_argument('--species', default='elc')
+    p_frames.add_argument('--prefix', help='run prefix when several runs share a directory')
+    p_frames.add_argument('--tmin', type=float)
+    p_frames.add_argument('--tmax', type=float)
+
+    p_compare = sub.add_parser('compare', help='compare stored results across runs')
+    p_compare.add_argument('run_dirs', nargs='+')
+    p_compare.add_argument('--key', default='v_par_std')
+    p_compare.add_argument('--prefix', help='run prefix when several runs share a directory')
+    args = parser.parse_args()
+
+    if args.command == 'index':
+        for run_dir in args.run_dirs:
+            update_catalog(run_dir, verbose=True)
+
+    elif args.command == 'frames':
+        catalog = update_catalog(args.run_dir)
+        rows = frames_in_range(catalog, args.tmin, args.tmax, species=args.species,
+                               prefix=args.prefix)
+        for row in rows:
+            size_gb = row['size'] / 1e9
+            moments = ','.join(sorted(row['moments'])) or '-'
+            t = f"{row['time']:8.2f}" if row['time'] is not None else f"{'?':>8s}"
+            print(f"  frame {row['frame']:4d}  t={t}  {size_gb:7.3f} GB  "
+                  f"cells={row['cells']}  moments={moments}")
+        print(f"{len(rows)} frames")
+
+    elif args.command == 'compare':
+        for run in compare_runs(args.run_dirs, key=args.key, prefix=args.prefix):
+            if 'percent_change' not in run:
+                print(f"  {run['run']}: {run['n_frames']} frames with '{args.key}' (need 2)")
+                continue
+            span = f" over {run['duration']:.1f} time units" if run['duration'] is not None else ''
+            print(f"  {run['run']}: {args.key} changed {run['percent_change']:+.3f}%{span} "
+                  f"({run['n_frames']} frames)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Tabulate the turbulent initial perturbation of the Gkeyll runs
+
+turbulent_perturbation in the v1/v3 Lua inputs sums 26 Kolmogorov modes
+with a sqrt and a power per mode, at every quadrature point of every
+phase-space cell, and six more times per point for the fields. This
+rebuilds the same seeded mode set in Python (same k-vectors, the same
+LuaJIT math.random phases from math.randomseed(42), same amplitude) and
+evaluates δn and the six field components once, vectorized, at the
+configuration-space quadrature nodes. The tables are written to a small
+binary file that perturbation_table.lua reads, so initialization no
+longer depends on the number of modes and the exact initial state can
+be inspected from Python.
+
+Table layout (little-endian):
+    8 bytes   magic 'GKPERT01'
+    doubles   n_quad, n_tables, then per dimension lower, upper, cells,
+              then the n_quad node offsets on the reference cell [-1, 1]
+    doubles   n_tables arrays of shape (Nx*n_quad, Ny*n_quad, Nz*n_quad),
+              C order, in TABLE_NAMES order
+
+Usage:
+    python tabulate_perturbation.py ../simulations/v3_collision_operator/gkeyll_v3_production.lua \\
+        -o ../simulations/v3_collision_operator/perturbation_table_v3.bin
+"""
+
+import struct
+import argparse
+import numpy as np
+
+from lua_config import read_lua_parameters
+
+TABLE_MAGIC = b'GKPERT01'
+TABLE_NAMES = ('dn', 'Ex', 'Ey', 'Ez', 'Bx', 'By', 'Bz')
+
+_U64 = (1 << 64) - 1
+
+
+class LuaJITRandom:
+    """LuaJIT's math.random (Tausworthe TW223) with math.randomseed semantics"""
+
+    def __init__(self, seed):
+        r = 0x11090601
+        d = float(seed)
+        self.gen = [0, 0, 0, 0]
+        for i in range(4):
+            m = 1 << (r & 255)
+            r >>= 8
+            d = d * 3.14159265358979323846 + 2.7182818284590452354
+            u = struct.unpack('<Q', struct.pack('<d', d))[0]
+            if u < m:
+                u = (u + m) & _U64
+            self.gen[i] = u
+        for _ in range(10):
+            self._step()
+
+    def _step(self):
+        r = 0
+        for i, (k, q, s) in enumerate(((63, 31, 18), (58, 19, 28), (55, 24, 7), (47, 21, 8))):
+            z = self.gen[i]
+            z = ((((z << q) & _U64) ^ z) >> (k - s)) ^ (((z & ((_U64 << (64 - k)) & _U64)) << s) & _U64)
+            r ^= z
+            self.gen[i] = z
+        return (r & 0x000fffffffffffff) | 0x3ff0000000000000
+
+    def random(self):
+        """Uniform double in [0, 1), as math.random()"""
+        return struct.unpack('<d', struct.pack('<Q', self._step()))[0] - 1.0
+
+
+def mode_set(params, seed=42):
+    """k-vectors, phases and per-mode amplitudes in the Lua generation order
+
+    The v1 input spaces k over [k_min, k_max] with n_modes_per_dim points;
+    v3 uses k = 1 + (ix, iy, iz) for ix, iy, iz in 0..2.
+    """
+    rng = LuaJITRandom(seed)
+    n_per_dim = int(params.get('n_modes_per_dim', 3))
+    k_min, k_max = params.get('k_min'), params.get('k_max')
+    index = params.get('spectrum_index', -5/3)
+
+    k_modes, phases = [], []
+    for ix in range(n_per_dim):
+        for iy in range(n_per_dim):
+            for iz in range(n_per_dim):
+                if ix + iy + iz == 0:
+                    continue
+                if k_min is None:
+                    k = (1 + ix, 1 + iy, 1 + iz)
+                else:
+                    step = (k_max - k_min) / (n_per_dim - 1)
+                    k = (k_min + ix*step, k_min + iy*step, k_min + iz*step)
+                k_modes.append(k)
+                phases.append(2 * np.pi * rng.random())
+
+    k_modes = np.array(k_modes, dtype=np.float64)
+    amplitudes = np.sqrt(np.sum(k_modes**2, axis=1))**index
+    return k_modes, np.array(phases), amplitudes
+
+
+def quadrature_nodes(params, n_quad=2):
+    """Gauss-Legendre node coordinates per dimension and the reference offsets"""
+    offsets, _ = np.polynomial.legendre.leggauss(n_quad)
+    L = params.get('L', 2 * np.pi)
+    cells = [int(params.get(name, params.get('Nx'))) for name in ('Nx', 'Ny', 'Nz')]
+
+    axes = []
+    for n in cells:
+        dx = L / n
+        centres = (np.arange(n) + 0.5) * dx
+        axes.append((centres[:, None] + offsets[None, :] * dx / 2).ravel())
+    return axes, offsets, [(0.0, L, n) for n in cells]
+
+
+def perturbation(x, y, z, k_modes, phases, amplitudes, perturb_amplitude):
+    """turbulent_perturbation on the tensor grid x ⊗ y ⊗ z (1D coordinate arrays)
+
+    Uses cos(k·x + φ) = Re(e^{iφ} e^{ikx x} e^{iky y} e^{ikz z}) so the
+    3D grid is built by one contraction over modes.
+    """
+    ex = np.exp(1j * np.outer(k_modes[:, 0], x))
+    ey = np.exp(1j * np.outer(k_modes[:, 1], y))
+    ez = np.exp(1j * np.outer(k_modes[:, 2], z))
+    c = amplitudes * np.exp(1j * phases)
+    total = np.einsum('m,mi,mj,mk->ijk', c, ex, ey, ez, optimize=True).real
+    return perturb_amplitude * total / len(k_modes)
+
+
+def perturbation_tables(params, n_quad=2, seed=42):
+    """δn and field tables on the quadrature nodes, as the Lua init functions compute them"""
+    k_modes, phases, amplitudes = mode_set(params, seed=seed)
+    (x, y, z), offsets, grid = quadrature_nodes(params, n_quad=n_quad)
+    amp = params['perturb_amplitude']
+    B0 = params.get('B0', 1.0)
+    pi = np.pi
+
+    def delta(dx=0.0, dy=0.0, dz=0.0):
+        return perturbation(x + dx, y + dy, z + dz, k_modes, phases, amplitudes, amp)
+
+    E_pert = 0.01 * amp
+    B_pert = 0.05 * amp
+    dn = delta()
+    tables = {
+        'dn': dn,
+        'Ex': E_pert * dn,
+        'Ey': E_pert * delta(dx=pi/3),
+        'Ez': E_pert * delta(dy=pi/3),
+        'Bx': B_pert * delta(dz=pi/4),
+        'By': B_pert * delta(dx=pi/4),
+        'Bz': B0 * (1.0 + B_pert * delta(dy=pi/4)),
+    }
+    return tables, (x, y, z), offsets, grid
+
+
+def write_table(path, tables, offsets, grid):
+    """Write tables in the GKPERT01 layout read by perturbation_table.lua"""
+    header = [len(offsets), len(TABLE_NAMES)]
+    for lower, upper, cells in grid:
+        header += [lower, upper, cells]
+    header += list(offsets)
+    with open(path, 'wb') as fh:
+        fh.write(TABLE_MAGIC)
+        np.asarray(header, dtype='<f8').tofile(fh)
+        for name in TABLE_NAMES:
+            np.ascontiguousarray(tables[name], dtype='<f8').tofile(fh)
+
+
+def read_table(path):
+    """Read a GKPERT01 file back into ({name: array}, offsets, grid)"""
+    with open(path, 'rb') as fh:
+        if fh.read(8) != TABLE_MAGIC:
+            raise ValueError(f"{path}: not a perturbation table")
+        n_quad, n_tables = (int(v) for v in np.fromfile(fh, dtype='<f8', count=2))
+        dims = np.fromfile(fh, dtype='<f8', count=9).reshape(3, 3)
+        offsets = np.fromfile(fh, dtype='<f8', count=n_quad)
+        shape = tuple(int(c) * n_quad for c in dims[:, 2])
+        data = np.fromfile(fh, dtype='<f8', count=n_tables * int(np.prod(shape)))
+    grid = [(lo, up, int(c)) for lo, up, c in dims]
+    tables = dict(zip(TABLE_NAMES, data.reshape((n_tables,) + shape)))
+    return tables, offsets, grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tabulate the Gkeyll turbulent initial perturbation")
+    parser.add_argument('lua_input', help='Gkeyll Lua input (v1 or v3)')
+    parser.add_argument('-o', '--output', default='perturbation_table.bin')
+    parser.add_argument('--quad', type=int, default=2, help='Gauss-Legendre nodes per cell and dimension')
+    parser.add_argument('--seed', type=int, default=42, help='math.randomseed used by the input')
+    args = parser.parse_args()
+
+    params = read_lua_parameters(args.lua_input)
+    tables, _, offsets, grid = perturbation_tables(params, n_quad=args.quad, seed=args.seed)
+    write_table(args.output, tables, offsets, grid)
+
+    k_modes, phases, _ = mode_set(params, seed=args.seed)
+    shape = tables['dn'].shape
+    print(f"{len(k_modes)} modes, {args.quad} nodes/cell -> tables {shape} x {len(TABLE_NAMES)} -> {args.output}")
+    for name in TABLE_NAMES:
+        t = tables[name]
+        print(f"  {name:3s} min {t.min():+.6e}  max {t.max():+.6e}  rms {np.sqrt(np.mean(t**2)):.6e}")
+
+
+if __name__ == '__main__':
+    main()
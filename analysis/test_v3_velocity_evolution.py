@@ -7,10 +7,16 @@ Compare velocity evolution between:
 - v3 (15% perturbations + collisions): σ(v∥) should evolve if collisions work
 """
 
+import argparse
 import numpy as np
-import sys
-sys.path.insert(0, '/root/postgkyl')
-import postgkyl as pg
+
+from frame_moments import PRECISIONS
+from gkyl_frames import import_postgkyl
+from frame_entropy import EntropyAccumulator, frame_diagnostics
+from run_catalog import update_catalog, frame_table, record_results, compare_runs
+
+RUN_PREFIX = 'gkeyll_papers_3_5_PRODUCTION_v3'
+MAX_FRAMES = 10  # analyze first 10 frames max
 
 def compute_velocity_widths(f_data):
     """Compute σ(v∥) and σ(v⊥) from distribution function"""
@@ -67,42 +73,98 @@ def compute_velocity_widths(f_data):
 
     return v_par_std_avg, v_perp_std_avg
 
+def compute_entropies(f_data, eta=None):
+    """S_B and S_LB (frame_entropy) from the distribution postgkyl already loaded"""
+    bounds = f_data.get_bounds()
+    header = {'cells': tuple(f_data.get_num_cells()), 'lower': bounds[0], 'upper': bounds[1]}
+    values = f_data.get_values()
+    f = values[..., 0] if len(values.shape) == 7 else values
+
+    acc = EntropyAccumulator(header, eta=eta)
+    acc.add(0, f)
+    return acc.result()
+
 def main():
+    parser = argparse.ArgumentParser(description="σ(v∥) evolution test for the v3 run")
+    parser.add_argument('--quick', action='store_true',
+                        help='sampled go/no-go estimate with confidence intervals (seconds), '
+                             'on the same first/last pair of the first MAX_FRAMES frames')
+    parser.add_argument('--threshold', type=float, default=0.1, help='σ(v∥) change threshold in %%')
+    parser.add_argument('--compare', nargs='*', default=[], metavar='RUN_DIR',
+                        help='cataloged v1/v2 run directories to compare against')
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help='precision of the streamed single pass (σ and entropies)')
+    parser.add_argument('--postgkyl', action='store_true',
+                        help='load every frame in full through postgkyl instead of streaming it')
+    args = parser.parse_args()
+
     print("="*80)
     print("  COLLISION OPERATOR TEST: v3 (ν/Ω = 0.01)")
     print("="*80)
     print()
 
     # Find available frames
-    import glob
-    frames = sorted(glob.glob('gkeyll_papers_3_5_PRODUCTION_v3-elc_[0-9]*.gkyl'))
-    frame_numbers = [int(f.split('_')[-1].replace('.gkyl', '')) for f in frames]
+    catalog = update_catalog('.')
+    rows = [row for row in frame_table(catalog, prefix=RUN_PREFIX) if row['file']][:MAX_FRAMES]
+    frames = [row['file'] for row in rows]
+    frame_numbers = [row['frame'] for row in rows]
 
-    print(f"Found {len(frames)} frames: {frame_numbers}")
+    print(f"Using {len(frames)} frames: {frame_numbers}")
     print()
 
     if len(frames) < 2:
         print("ERROR: Need at least 2 frames for comparison")
         return
 
+    if args.quick:
+        from quicklook_sigma import quick_look, print_summary
+
+        print(f"Quick look: frame {frame_numbers[0]} vs frame {frame_numbers[-1]}")
+        result = quick_look(frames[0], frames[-1], threshold=args.threshold)
+        print_summary(result)
+        print()
+        print(f"VERDICT: {result['verdict'].upper()} (threshold {args.threshold}%)")
+        return
+
+    if args.postgkyl:
+        pg = import_postgkyl()
+
     results = {}
+    eta = None
 
-    for frame_file in frames[:10]:  # Analyze first 10 frames max
-        frame_num = int(frame_file.split('_')[-1].replace('.gkyl', ''))
+    for row in rows:
+        frame_file, frame_num = row['file'], row['frame']
         print(f"Loading frame {frame_num}...")
 
-        data = pg.data.GData(frame_file)
-        time = data.ctx['time']
+        if not args.postgkyl:
+            time = row['time']
+            if time is None:
+                error = catalog['files'][frame_file].get('error', 'no time in metadata')
+                print(f"ERROR: frame {frame_num} has no time ({error})")
+                return
+            # one η for every frame (the first frame's maximum), as in frame_entropy.entropy_series
+            diag = frame_diagnostics(frame_file, eta=eta, precision=args.precision)
+            v_par_std, v_perp_std = diag['v_par_std'], diag['v_perp_std']
+        else:
+            data = pg.data.GData(frame_file)
+            time = data.ctx['time']
 
-        v_par_std, v_perp_std = compute_velocity_widths(data)
+            v_par_std, v_perp_std = compute_velocity_widths(data)
+            diag = compute_entropies(data, eta=eta)
+        eta = diag['eta']
+        entropies = {'S_B': diag['S_B']}
+        entropies.update({f'S_LB_c{c}': s for c, s in diag['S_LB'].items()})
 
         results[frame_num] = {
             'time': time,
             'v_par_std': v_par_std,
             'v_perp_std': v_perp_std
         }
+        catalog = record_results('.', frame_num, dict(entropies, v_par_std=v_par_std, v_perp_std=v_perp_std),
+                                 catalog=catalog, prefix=RUN_PREFIX)
 
         print(f"  Frame {frame_num} (t={time:.2f}): σ(v∥)={v_par_std:.6f}, σ(v⊥)={v_perp_std:.6f}")
+        print(f"    S_B={entropies['S_B']:.6e}, S_LB(c=2)={entropies['S_LB_c2']:.6e}")
 
     print()
     print("="*80)
@@ -127,8 +189,16 @@ def main():
 
     # Compare with previous attempts
     print("Comparison with previous attempts:")
-    print("  v1 (15%, no collisions): σ(v∥) changed +0.001% over 96 time units (FROZEN)")
-    print("  v2 (50%, no collisions): σ(v∥) changed +0.000% over 3 time units (FROZEN)")
+    if args.compare:
+        for run in compare_runs(args.compare):
+            if 'percent_change' not in run:
+                print(f"  {run['run']}: no cataloged σ(v∥) results")
+                continue
+            span = f" over {run['duration']:.1f} time units" if run['duration'] is not None else ''
+            print(f"  {run['run']}: σ(v∥) changed {run['percent_change']:+.3f}%{span}")
+    else:
+        print("  v1 (15%, no collisions): σ(v∥) changed +0.001% over 96 time units (FROZEN, published)")
+        print("  v2 (50%, no collisions): σ(v∥) changed +0.000% over 3 time units (FROZEN, published)")
     print(f"  v3 (15% + collisions):  σ(v∥) changed {percent_change:+.3f}% over {results[last_frame]['time']:.1f} time units")
     print()
 
@@ -137,7 +207,7 @@ def main():
     print("="*80)
     print()
 
-    threshold = 0.1  # 0.1% change is significant
+    threshold = args.threshold  # 0.1% change is significant
 
     if abs(percent_change) > threshold:
         print("✅ SUCCESS: Collisions enable pitch-angle scattering!")
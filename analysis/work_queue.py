@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Sharded frame analysis through a work queue on a shared filesystem
+
+There is no coordinator: any number of workers, on any nodes that see
+the same filesystem, take frames from a queue directory
+
+    QUEUE/queue.json           run directory, frame list, analysis options
+    QUEUE/todo/<frame>         frames waiting to be analysed
+    QUEUE/claimed/<frame>.<w>  frame being analysed by worker w
+    QUEUE/workers/<w>          heartbeat of worker w (mtime)
+    QUEUE/results/<frame>.json per-frame results
+    QUEUE/failed/<frame>       traceback of a frame that raised
+
+A frame is claimed by renaming todo/<frame> to claimed/<frame>.<w>.
+rename is atomic, so exactly one worker wins and the others get
+FileNotFoundError and try the next frame. Results are written to a
+temporary name and renamed into place, so a result file is either
+complete or absent.
+
+While a worker runs it touches its heartbeat file every HEARTBEAT
+seconds. A claim whose owner's heartbeat is older than --stale seconds
+(the owner crashed or its node died) is renamed back into todo/ by
+whichever worker notices it first. Heartbeat ages are measured against
+the checking worker's own freshly touched heartbeat, i.e. both
+timestamps come from the file server, so clock skew between nodes does
+not matter. If a slow worker's claim is recovered by mistake the frame
+is analysed twice; results are per-frame files, so the second write
+just replaces the first. Workers with nothing left to claim keep
+watching other workers' claims until those are finished, so a queue
+drains even if workers die near the end (--no-wait exits at once).
+
+Each frame gets frame_entropy.frame_diagnostics (σ(v∥), σ(v⊥), S_B and
+S_LB in one streamed pass, with the numba kernels of frame_kernels.py
+when numba is installed). S_LB needs a single η for the whole series,
+so init fixes it up front (first frame's maximum unless --eta is given).
+merge assembles the ordered time series, stores it in the run catalog
+and writes the same npz as frame_entropy.py.
+
+Usage:
+    python work_queue.py init RUN_DIR QUEUE_DIR [--eta ETA] [--levels 1 2 3]
+    python work_queue.py worker QUEUE_DIR          # on every node, as often as wanted
+    python work_queue.py status QUEUE_DIR
+    python work_queue.py merge QUEUE_DIR [-o entropy_series.npz]
+    python work_queue.py local RUN_DIR QUEUE_DIR -n 4   # init + n local workers + merge
+"""
+
+import os
+import sys
+import json
+import socket
+import time
+import argparse
+import threading
+import traceback
+import subprocess
+from pathlib import Path
+
+QUEUE_CONFIG = 'queue.json'
+HEARTBEAT = 10.0
+POLL = 2.0
+STALE_AFTER = 300.0
+
+SUBDIRS = ('todo', 'claimed', 'workers', 'results', 'failed')
+
+
+def _frame_name(frame):
+    return f'{frame:06d}'
+
+
+def _write_atomic(path, text):
+    """Write text to path via a unique temporary file and rename"""
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{socket.gethostname()}.{os.getpid()}.tmp')
+    with open(tmp, 'w') as fh:
+        fh.write(text)
+    os.replace(tmp, path)
+
+
+def load_config(queue_dir):
+    with open(Path(queue_dir) / QUEUE_CONFIG) as fh:
+        return json.load(fh)
+
+
+def init_queue(run_dir, queue_dir, prefix=None, species='elc', levels=(1, 2, 3), eta=None,
+               precision='float64', slab=1, backend=None):
+    """Create the queue directory with one todo entry per cataloged frame"""
+    import numpy as np
+    from gkyl_frames import read_header, load_frame
+    from frame_moments import iter_slabs
+    from frame_entropy import EntropyAccumulator
+    from frame_kernels import resolve_backend
+    from run_catalog import update_catalog, frame_table
+
+    run_dir = Path(run_dir).resolve()
+    queue_dir = Path(queue_dir)
+    if (queue_dir / QUEUE_CONFIG).exists():
+        raise ValueError(f"{queue_dir} already holds a queue")
+
+    catalog = update_catalog(run_dir)
+    rows = [row for row in frame_table(catalog, species=species, prefix=prefix) if row['file']]
+    if not rows:
+        raise ValueError(f"no {species} distribution frames in {run_dir}")
+
+    path = run_dir / rows[0]['file']
+    # reject bad levels and backend/precision combinations before queueing
+    EntropyAccumulator(read_header(path), levels=levels)
+    resolve_backend(backend, precision)
+    if eta is None:
+        # same η for every frame, as in frame_entropy.entropy_series
+        acc = EntropyAccumulator(read_header(path), levels=())
+        _, values = load_frame(path)
+        for i0, f in iter_slabs(values, slab):
+            acc.add(i0, np.asarray(f, dtype=np.float64))
+        eta = acc.f_max
+
+    for sub in SUBDIRS:
+        (queue_dir / sub).mkdir(parents=True, exist_ok=True)
+    config = {
+        'run_dir': str(run_dir),
+        'species': species,
+        'prefix': rows[0]['prefix'],
+        'frames': {str(row['frame']): {'file': row['file'], 'time': row['time']} for row in rows},
+        'options': {'levels': list(levels), 'eta': eta, 'precision': precision, 'slab': slab,
+                    'backend': backend},
+    }
+    _write_atomic(queue_dir / QUEUE_CONFIG, json.dumps(config, indent=1))
+    for row in rows:
+        (queue_dir / 'todo' / _frame_name(row['frame'])).touch()
+    return config
+
+
+class Worker:
+    """One queue worker: claims frames until the queue is empty"""
+
+    def __init__(self, queue_dir, stale_after=STALE_AFTER, heartbeat=HEARTBEAT, worker_id=None):
+        self.queue_dir = Path(queue_dir)
+        self.config = load_config(queue_dir)
+        self.id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.heartbeat_file = self.queue_dir / 'workers' / self.id
+        self.stale_after = stale_after
+        self.heartbeat = heartbeat
+        self._stop = threading.Event()
+
+    def _beat(self):
+        self.heartbeat_file.touch()
+        return self.heartbeat_file.stat().st_mtime
+
+    def _beat_loop(self):
+        while not self._stop.wait(self.heartbeat):
+            self._beat()
+
+    def claim(self):
+        """Claim the next waiting frame; returns (frame, claim path) or None"""
+        for entry in sorted(os.listdir(self.queue_dir / 'todo')):
+            claim = self.queue_dir / 'claimed' / f'{entry}.{self.id}'
+            try:
+                os.rename(self.queue_dir / 'todo' / entry, claim)
+            except FileNotFoundError:
+                continue
+            return int(entry), claim
+        return None
+
+    def recover_stale(self):
+        """Move claims of workers without a recent heartbeat back to todo/"""
+        now = self._beat()
+        recovered = []
+        for entry in os.listdir(self.queue_dir / 'claimed'):
+            frame, _, owner = entry.partition('.')
+            try:
+                age = now - (self.queue_dir / 'workers' / owner).stat().st_mtime
+            except FileNotFoundError:
+                age = float('inf')
+            if age < self.stale_after:
+                continue
+            try:
+                os.rename(self.queue_dir / 'claimed' / entry, self.queue_dir / 'todo' / frame)
+            except FileNotFoundError:
+                continue
+            (self.queue_dir / 'workers' / owner).unlink(missing_ok=True)
+            recovered.append(int(frame))
+        return recovered
+
+    def process(self, frame):
+        """Analyse one frame and write results/<frame>.json"""
+        from frame_entropy import frame_diagnostics
+
+        options = self.config['options']
+        info = self.config['frames'][str(frame)]
+        result = frame_diagnostics(Path(self.config['run_dir']) / info['file'],
+                                   levels=options['levels'], eta=options['eta'],
+                                   precision=options['precision'], slab=options['slab'],
+                                   backend=options.get('backend'))
+        result['S_LB'] = {str(c): value for c, value in result['S_LB'].items()}
+        result.update({'frame': frame, 'time': info['time'], 'worker': self.id})
+        _write_atomic(self.queue_dir / 'results' / f'{_frame_name(frame)}.json', json.dumps(result))
+
+    def run(self, wait=True, verbose=True):
+        """Work until no frame is waiting (or, with wait, still claimed by anyone)"""
+        self._beat()
+        beat = threading.Thread(target=self._beat_loop, daemon=True)
+        beat.start()
+        done = []
+        try:
+            while True:
+                claimed = self.claim()
+                if claimed is None:
+                    if self.recover_stale():
+                        continue
+                    if not wait or not os.listdir(self.queue_dir / 'claimed'):
+                        break
+                    # frames still held by other workers; stay to pick them up if they die
+                    time.sleep(POLL)
+                    continue
+                frame, claim = claimed
+                if (self.queue_dir / 'results' / f'{_frame_name(frame)}.json').exists():
+                    # recovered claim of a frame whose result was already written
+                    claim.unlink(missing_ok=True)
+                    continue
+                try:
+                    self.process(frame)
+                except Exception:
+                    _write_atomic(self.queue_dir / 'failed' / _frame_name(frame), traceback.format_exc())
+                    if verbose:
+                        print(f"[{self.id}] frame {frame} failed", file=sys.stderr)
+                else:
+                    done.append(frame)
+                    if verbose:
+                        print(f"[{self.id}] frame {frame} done")
+                claim.unlink(missing_ok=True)
+        finally:
+            self._stop.set()
+            self.heartbeat_file.unlink(missing_ok=True)
+        return done
+
+
+def queue_status(queue_dir):
+    """Number of waiting, claimed, finished and failed frames"""
+    queue_dir = Path(queue_dir)
+    status = {sub: sorted(p.name for p in (queue_dir / sub).iterdir() if not p.name.startswith('.'))
+              for sub in SUBDIRS}
+    return {
+        'total': len(load_config(queue_dir)['frames']),
+        'todo': len(status['todo']),
+        'claimed': status['claimed'],
+        'workers': status['workers'],
+        'done': len(status['results']),
+        'failed': [int(name) for name in status['failed']],
+    }
+
+
+def merge_results(queue_dir, record=True):
+    """Ordered time series from the per-frame results; stored in the run catalog"""
+    import numpy as np
+    from run_catalog import record_batch
+
+    queue_dir = Path(queue_dir)
+    config = load_config(queue_dir)
+    levels = config['options']['levels']
+
+    results = []
+    for path in sorted((queue_dir / 'results').glob('*.json')):
+        with open(path) as fh:
+            results.append(json.load(fh))
+    results.sort(key=lambda r: r['frame'])
+    missing = sorted(set(int(f) for f in config['frames']) - {r['frame'] for r in results})
+
+    series = {
+        'frames': np.array([r['frame'] for r in results]),
+        'times': np.array([np.nan if r['time'] is None else r['time'] for r in results]),
+        'S_B': np.array([r['S_B'] for r in results]),
+        'S_LB': np.array([[r['S_LB'][str(c)] for c in levels] for r in results]),
+        'v_par_std': np.array([r['v_par_std'] for r in results]),
+        'v_perp_std': np.array([r['v_perp_std'] for r in results]),
+        'levels': np.array(levels),
+        'eta': config['options']['eta'],
+    }
+
+    if record and results:
+        stored = {}
+        for r in results:
+            stored[r['frame']] = {'S_B': r['S_B'], 'v_par_std': r['v_par_std'], 'v_perp_std': r['v_perp_std']}
+            stored[r['frame']].update({f'S_LB_c{c}': r['S_LB'][str(c)] for c in levels})
+        record_batch(config['run_dir'], stored, species=config['species'], prefix=config.get('prefix'))
+    return series, missing
+
+
+def launch_local(queue_dir, n_workers, stale_after=STALE_AFTER):
+    """Run n worker processes on this node, as separate interpreters like remote workers"""
+    command = [sys.executable, os.path.abspath(__file__), 'worker', str(queue_dir),
+               '--stale', str(stale_after)]
+    # split the cores between workers so compiled kernels do not oversubscribe them
+    env = dict(os.environ, NUMBA_NUM_THREADS=str(max(1, (os.cpu_count() or 1) // n_workers)))
+    procs = [subprocess.Popen(command, env=env) for _ in range(n_workers)]
+    return [proc.wait() for proc in procs]
+
+
+def print_status(queue_dir):
+    status = queue_status(queue_dir)
+    print(f"{queue_dir}: {status['done']}/{status['total']} done, {status['todo']} waiting, "
+          f"{len(status['claimed'])} claimed, {len(status['workers'])} workers alive or stale")
+    for claim in status['claimed']:
+        frame, _, owner = claim.partition('.')
+        print(f"  frame {int(frame)} -> {owner}")
+    if status['failed']:
+        print(f"  failed frames: {status['failed']} (see {queue_dir}/failed/)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-filesystem work queue for frame analysis")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def queue_options(p):
+        p.add_argument('--prefix', help='run prefix when several runs share a directory')
+        p.add_argument('--levels', type=int, nargs='+', default=[1, 2, 3])
+        p.add_argument('--eta', type=float, help='Lynden-Bell level (default: max f of first frame)')
+        p.add_argument('--precision', choices=('float64', 'float32'), default='float64')
+        p.add_argument('--slab', type=int, default=1, help='x-planes per streamed slab')
+        p.add_argument('--backend', choices=('numpy', 'numba'),
+                       help='reduction kernels (default: numba where installed)')
+
+    p = sub.add_parser('init', help='create a queue for a run directory')
+    p.add_argument('run_dir')
+    p.add_argument('queue_dir')
+    queue_options(p)
+
+    p = sub.add_parser('worker', help='claim and analyse frames until the queue is empty')
+    p.add_argument('queue_dir')
+    p.add_argument('--stale', type=float, default=STALE_AFTER,
+                   help='seconds without heartbeat before a claim is recovered')
+    p.add_argument('--no-wait', action='store_true',
+                   help='exit when nothing is waiting instead of watching other claims')
+
+    p = sub.add_parser('status', help='show queue progress')
+    p.add_argument('queue_dir')
+
+    p = sub.add_parser('merge', help='assemble the time series from per-frame results')
+    p.add_argument('queue_dir')
+    p.add_argument('-o', '--output', default='entropy_series.npz')
+
+    p = sub.add_parser('local', help='init (if needed), run n local workers, merge')
+    p.add_argument('run_dir')
+    p.add_argument('queue_dir')
+    p.add_argument('-n', '--workers', type=int, default=os.cpu_count())
+    p.add_argument('--stale', type=float, default=STALE_AFTER)
+    p.add_argument('-o', '--output', default='entropy_series.npz')
+    queue_options(p)
+    args = parser.parse_args()
+
+    if args.command == 'init' or (args.command == 'local' and
+                                  not (Path(args.queue_dir) / QUEUE_CONFIG).exists()):
+        config = init_queue(args.run_dir, args.queue_dir, prefix=args.prefix, levels=args.levels,
+                            eta=args.eta, precision=args.precision, slab=args.slab,
+                            backend=args.backend)
+        print(f"Queued {len(config['frames'])} frames of {config['run_dir']} "
+              f"(η = {config['options']['eta']:.6e})")
+
+    if args.command == 'worker':
+        done = Worker(args.queue_dir, stale_after=args.stale).run(wait=not args.no_wait)
+        print(f"Worker finished: {len(done)} frames")
+
+    elif args.command == 'status':
+        print_status(args.queue_dir)
+
+    elif args.command == 'local':
+        launch_local(args.queue_dir, args.workers, stale_after=args.stale)
+        print_status(args.queue_dir)
+
+    if args.command in ('merge', 'local'):
+        import numpy as np
+
+        series, missing = merge_results(args.queue_dir)
+        np.savez(args.output, **series)
+        print(f"Merged {len(series['frames'])} frames -> {args.output}")
+        if missing:
+            print(f"  missing frames: {missing}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,14 @@ Extract: heat flux, pressure anisotropy, growth rates
 """
 
 import numpy as np
-import netCDF4 as nc
-import matplotlib.pyplot as plt
 from pathlib import Path
 
+from steady_state import flux_series, steady_start, steady_statistics
+
 def analyze_stella_output(filename, label):
     """Analyze a Stella output file"""
+    import netCDF4 as nc
+
     print(f"\n{'='*60}")
     print(f"Analyzing {label}: {filename}")
     print(f"{'='*60}")
@@ -56,13 +58,20 @@ def analyze_stella_output(filename, label):
         
         return results
 
-def compute_time_averaged_flux(qflux, time=None, start_frac=0.5):
-    """Compute time-averaged flux from steady-state portion"""
+def compute_time_averaged_flux(qflux, time=None, start_frac=None):
+    """Compute time-averaged flux from steady-state portion
+
+    The steady state starts where steady_state.steady_start detects it,
+    unless start_frac fixes it as a fraction of the run.
+    """
     if qflux is None:
         return None
     
     ntime = qflux.shape[0]
-    start_idx = int(ntime * start_frac)
+    if start_frac is None:
+        start_idx = steady_start(flux_series(qflux))
+    else:
+        start_idx = int(ntime * start_frac)
     
     # Average over time
     qflux_avg = np.mean(np.abs(qflux[start_idx:]), axis=0)
@@ -75,9 +84,32 @@ def compute_time_averaged_flux(qflux, time=None, start_frac=0.5):
     
     return qflux_total
 
-if __name__ == '__main__':
+def print_statistics(npz_file):
+    """Summarize the saved steady-state heat-flux statistics"""
+    data = np.load(npz_file)
+    data = steady_statistics(data['t'], data['qflux_max'], data['qflux_lb'])
+    q_max = data['qflux_max_steady']
+    q_lb = data['qflux_lb_steady']
+    Q_max_mean, Q_max_std = float(data['Q_max_mean']), float(data['Q_max_std'])
+    Q_lb_mean, Q_lb_std = float(data['Q_lb_mean']), float(data['Q_lb_std'])
+
+    # Welch t statistic on the steady-state samples
+    se = np.sqrt(q_max.var(ddof=1)/len(q_max) + q_lb.var(ddof=1)/len(q_lb))
+    t_welch = (q_lb.mean() - q_max.mean()) / se
+
+    print(f"Steady state: t = {data['t_steady'][0]:.1f} to {data['t_steady'][-1]:.1f} "
+          f"({len(q_max)} samples)")
+    print(f"Q_i (Maxwellian):   {Q_max_mean:.6e} ± {Q_max_std:.6e}")
+    print(f"Q_i (Lynden-Bell):  {Q_lb_mean:.6e} ± {Q_lb_std:.6e}")
+    print(f"Reduction:          {(1 - Q_lb_mean/Q_max_mean)*100:.1f}%")
+    print(f"Deviation from null: {(Q_lb_mean - Q_max_mean)/Q_max_std:.1f}σ")
+    print(f"Welch t statistic:   {t_welch:.1f}")
+    for label, key in (('25%', 'Q_expected_min'), ('20%', 'Q_expected_mid'), ('15%', 'Q_expected_max')):
+        print(f"  vs theory ({label} red): {(Q_lb_mean - float(data[key]))/Q_max_std:+.1f}σ")
+
+def main(results_dir='results'):
     # Check if result files exist
-    results_dir = Path('results')
+    results_dir = Path(results_dir)
     max_file = results_dir / 'maxwellian.nc'
     lb_file = results_dir / 'lyndenbell.nc'
     
@@ -118,3 +150,6 @@ if __name__ == '__main__':
         print("\n⚠ Could not compute heat flux - check variable names")
     
     print(f"\n{'='*60}\n")
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ Generate all publication figures for PRL Paper 6
 Gyrokinetic validation of Lynden-Bell pressure anisotropy
 """
 
+import os
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')
@@ -11,443 +12,487 @@ import matplotlib.pyplot as plt
 from matplotlib.gridspec import GridSpec
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
-import netCDF4 as nc
-
-# Set publication style
-plt.rcParams.update({
-    'font.size': 11,
-    'font.family': 'serif',
-    'axes.labelsize': 12,
-    'axes.titlesize': 13,
-    'xtick.labelsize': 10,
-    'ytick.labelsize': 10,
-    'legend.fontsize': 10,
-    'figure.titlesize': 14,
-    'lines.linewidth': 1.5
-})
-
-print("="*70)
-print("GENERATING ALL PUBLICATION FIGURES")
-print("="*70)
-
-# Load statistical analysis data
-data = np.load('statistical_analysis.npz')
-t = data['t']
-t_steady = data['t_steady']
-qflux_max = data['qflux_max']
-qflux_lb = data['qflux_lb']
-qflux_max_steady = data['qflux_max_steady']
-qflux_lb_steady = data['qflux_lb_steady']
-phi2_max = data['phi2_max']
-phi2_lb = data['phi2_lb']
-Q_max_mean = data['Q_max_mean']
-Q_max_std = data['Q_max_std']
-Q_lb_mean = data['Q_lb_mean']
-Q_lb_std = data['Q_lb_std']
-Q_expected_min = data['Q_expected_min']
-Q_expected_mid = data['Q_expected_mid']
-Q_expected_max = data['Q_expected_max']
-
-# Statistical values
-sigma_vs_null = -17.6
-sigma_vs_theory_min = (Q_lb_mean - Q_expected_min) / Q_max_std
-sigma_vs_theory_mid = (Q_lb_mean - Q_expected_mid) / Q_max_std
-sigma_vs_theory_max = (Q_lb_mean - Q_expected_max) / Q_max_std
-
-#==============================================================================
-# FIGURE 1: Time Evolution (4 panels)
-#==============================================================================
-print("\nCreating Figure 1: Time Evolution...")
-
-fig = plt.figure(figsize=(12, 10))
-gs = GridSpec(3, 2, figure=fig, hspace=0.35, wspace=0.3)
-
-# Panel A: Turbulence amplitude (full time)
-ax1 = fig.add_subplot(gs[0, :])
-ax1.semilogy(t, phi2_max, 'b-', label='Maxwellian (Δ=0)', linewidth=1.8, alpha=0.9)
-ax1.semilogy(t, phi2_lb, 'r-', label='Lynden-Bell (Δ=-0.05)', linewidth=1.8, alpha=0.9)
-ax1.axvspan(t[len(t)//2], t[-1], alpha=0.1, color='gray', label='Steady state')
-ax1.set_xlabel(r'Time ($R/v_{\rm thi}$)')
-ax1.set_ylabel(r'$|\phi|^2$ (turbulence amplitude)')
-ax1.legend(loc='upper left', framealpha=0.9)
-ax1.grid(True, alpha=0.3, which='both')
-ax1.set_title('(a) Turbulence Amplitude Evolution', fontweight='bold', loc='left')
-ax1.text(0.95, 0.95, f'99.8% reduction\nin saturation level',
-         transform=ax1.transAxes, ha='right', va='top', fontsize=10,
-         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.7))
-
-# Panel B: Heat flux (full time)
-ax2 = fig.add_subplot(gs[1, :])
-ax2.plot(t, qflux_max, 'b-', label='Maxwellian', linewidth=1.8, alpha=0.9)
-ax2.plot(t, qflux_lb*1e5, 'r-', label=r'Lynden-Bell ($\times 10^5$)', linewidth=1.8, alpha=0.9)
-ax2.axvspan(t[len(t)//2], t[-1], alpha=0.1, color='gray')
-ax2.set_xlabel(r'Time ($R/v_{\rm thi}$)')
-ax2.set_ylabel(r'Ion Heat Flux $Q_i$')
-ax2.legend(loc='upper left', framealpha=0.9)
-ax2.grid(True, alpha=0.3)
-ax2.set_title('(b) Heat Flux Evolution', fontweight='bold', loc='left')
-ax2.text(0.95, 0.95, f'~100% reduction\n17.6σ significance',
-         transform=ax2.transAxes, ha='right', va='top', fontsize=10,
-         bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
-
-# Panel C: Early time detail - turbulence
-ax3 = fig.add_subplot(gs[2, 0])
-early_idx = int(0.2 * len(t))  # First 20%
-ax3.semilogy(t[:early_idx], phi2_max[:early_idx], 'b-', linewidth=2)
-ax3.semilogy(t[:early_idx], phi2_lb[:early_idx], 'r-', linewidth=2)
-ax3.set_xlabel(r'Time ($R/v_{\rm thi}$)')
-ax3.set_ylabel(r'$|\phi|^2$')
-ax3.grid(True, alpha=0.3, which='both')
-ax3.set_title('(c) Early Time: Linear Growth vs Damping', fontweight='bold', loc='left', fontsize=11)
-ax3.annotate('Exponential\ngrowth', xy=(50, 1e5), fontsize=9,
-             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
-ax3.annotate('Damping', xy=(50, 1), fontsize=9,
-             bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.8))
-
-# Panel D: Steady state distribution
-ax4 = fig.add_subplot(gs[2, 1])
-bins_max = 50
-counts_max, bins_max_edges, _ = ax4.hist(qflux_max_steady, bins=bins_max, alpha=0.7, color='blue',
-         label=f'Maxwellian\n'+r'$\mu=$'+f'{Q_max_mean:.1e}\n'+r'$\sigma=$'+f'{Q_max_std:.1e}',
-         density=True, edgecolor='black', linewidth=0.5)
-ax4.set_xlabel(r'$Q_i$ (Maxwellian scale)')
-ax4.set_ylabel('Probability Density')
-ax4.legend(loc='upper right', fontsize=9, framealpha=0.9)
-ax4.set_title('(d) Steady State Distribution (Maxwellian)', fontweight='bold', loc='left', fontsize=11)
-ax4.grid(True, alpha=0.3)
-ax4.text(0.05, 0.95, f'LB distribution\noff-scale\n(~10⁻⁵)', transform=ax4.transAxes,
-         fontsize=9, va='top', bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.7))
-
-plt.savefig('fig1_time_evolution.png', dpi=300, bbox_inches='tight')
-print("✓ Saved fig1_time_evolution.png")
-
-#==============================================================================
-# FIGURE 2: Observed vs Expected Statistical Comparison (2 panels)
-#==============================================================================
-print("Creating Figure 2: Observed vs Expected...")
-
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# Panel A: Bar chart with error bars
-categories = ['Maxwellian\n(Baseline)', 'Expected\n(15% red)', 'Expected\n(20% red)',
-              'Expected\n(25% red)', 'Observed\n(Δ=-0.05)']
-values = [Q_max_mean, Q_expected_max, Q_expected_mid, Q_expected_min, Q_lb_mean]
-errors = [Q_max_std, 0, 0, 0, Q_lb_std]
-colors = ['steelblue', 'lightgreen', 'lightgreen', 'lightgreen', 'crimson']
-
-bars = ax1.bar(categories, values, yerr=errors, capsize=8, alpha=0.75,
-               color=colors, edgecolor='black', linewidth=2)
-
-# Add value labels
-for i, (bar, val, err) in enumerate(zip(bars, values, errors)):
-    if i == 4:  # Observed
-        ax1.text(bar.get_x() + bar.get_width()/2, val + err + 200,
-                f'{val:.2e}\n(≈0)', ha='center', va='bottom', fontsize=9, fontweight='bold')
+
+from steady_state import steady_start, steady_statistics
+
+def main():
+    # Set publication style
+    plt.rcParams.update({
+        'font.size': 11,
+        'font.family': 'serif',
+        'axes.labelsize': 12,
+        'axes.titlesize': 13,
+        'xtick.labelsize': 10,
+        'ytick.labelsize': 10,
+        'legend.fontsize': 10,
+        'figure.titlesize': 14,
+        'lines.linewidth': 1.5
+    })
+
+    print("="*70)
+    print("GENERATING ALL PUBLICATION FIGURES")
+    print("="*70)
+
+    # Load statistical analysis data
+    data = np.load('statistical_analysis.npz')
+    t = data['t']
+    qflux_max = data['qflux_max']
+    qflux_lb = data['qflux_lb']
+    phi2_max = data['phi2_max']
+    phi2_lb = data['phi2_lb']
+
+    # Steady state detected from the flux series (MSER), not assumed
+    i_steady = steady_start(qflux_max, qflux_lb)
+    steady = steady_statistics(t, qflux_max, qflux_lb, start=i_steady)
+    t_steady = steady['t_steady']
+    qflux_max_steady = steady['qflux_max_steady']
+    qflux_lb_steady = steady['qflux_lb_steady']
+    Q_max_mean = steady['Q_max_mean']
+    Q_max_std = steady['Q_max_std']
+    Q_lb_mean = steady['Q_lb_mean']
+    Q_lb_std = steady['Q_lb_std']
+    Q_expected_min = steady['Q_expected_min']
+    Q_expected_mid = steady['Q_expected_mid']
+    Q_expected_max = steady['Q_expected_max']
+    print(f"Steady state from t = {t_steady[0]:.1f} ({len(t_steady)} samples)")
+
+    # Statistical values
+    sigma_vs_null = (Q_lb_mean - Q_max_mean) / Q_max_std
+    sigma_vs_theory_min = (Q_lb_mean - Q_expected_min) / Q_max_std
+    sigma_vs_theory_mid = (Q_lb_mean - Q_expected_mid) / Q_max_std
+    sigma_vs_theory_max = (Q_lb_mean - Q_expected_max) / Q_max_std
+
+    #==============================================================================
+    # FIGURE 1: Time Evolution (4 panels)
+    #==============================================================================
+    print("\nCreating Figure 1: Time Evolution...")
+
+    fig = plt.figure(figsize=(12, 10))
+    gs = GridSpec(3, 2, figure=fig, hspace=0.35, wspace=0.3)
+
+    # Panel A: Turbulence amplitude (full time)
+    ax1 = fig.add_subplot(gs[0, :])
+    ax1.semilogy(t, phi2_max, 'b-', label='Maxwellian (Δ=0)', linewidth=1.8, alpha=0.9)
+    ax1.semilogy(t, phi2_lb, 'r-', label='Lynden-Bell (Δ=-0.05)', linewidth=1.8, alpha=0.9)
+    ax1.axvspan(t_steady[0], t[-1], alpha=0.1, color='gray', label='Steady state')
+    ax1.set_xlabel(r'Time ($R/v_{\rm thi}$)')
+    ax1.set_ylabel(r'$|\phi|^2$ (turbulence amplitude)')
+    ax1.legend(loc='upper left', framealpha=0.9)
+    ax1.grid(True, alpha=0.3, which='both')
+    ax1.set_title('(a) Turbulence Amplitude Evolution', fontweight='bold', loc='left')
+    ax1.text(0.95, 0.95, f'99.8% reduction\nin saturation level',
+             transform=ax1.transAxes, ha='right', va='top', fontsize=10,
+             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.7))
+
+    # Panel B: Heat flux (full time)
+    ax2 = fig.add_subplot(gs[1, :])
+    ax2.plot(t, qflux_max, 'b-', label='Maxwellian', linewidth=1.8, alpha=0.9)
+    ax2.plot(t, qflux_lb*1e5, 'r-', label=r'Lynden-Bell ($\times 10^5$)', linewidth=1.8, alpha=0.9)
+    ax2.axvspan(t_steady[0], t[-1], alpha=0.1, color='gray')
+    ax2.set_xlabel(r'Time ($R/v_{\rm thi}$)')
+    ax2.set_ylabel(r'Ion Heat Flux $Q_i$')
+    ax2.legend(loc='upper left', framealpha=0.9)
+    ax2.grid(True, alpha=0.3)
+    ax2.set_title('(b) Heat Flux Evolution', fontweight='bold', loc='left')
+    ax2.text(0.95, 0.95, f'~100% reduction\n{abs(sigma_vs_null):.1f}σ significance',
+             transform=ax2.transAxes, ha='right', va='top', fontsize=10,
+             bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.7))
+
+    # Panel C: Early time detail - turbulence
+    ax3 = fig.add_subplot(gs[2, 0])
+    early_idx = int(0.2 * len(t))  # First 20%
+    ax3.semilogy(t[:early_idx], phi2_max[:early_idx], 'b-', linewidth=2)
+    ax3.semilogy(t[:early_idx], phi2_lb[:early_idx], 'r-', linewidth=2)
+    ax3.set_xlabel(r'Time ($R/v_{\rm thi}$)')
+    ax3.set_ylabel(r'$|\phi|^2$')
+    ax3.grid(True, alpha=0.3, which='both')
+    ax3.set_title('(c) Early Time: Linear Growth vs Damping', fontweight='bold', loc='left', fontsize=11)
+    ax3.annotate('Exponential\ngrowth', xy=(50, 1e5), fontsize=9,
+                 bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
+    ax3.annotate('Damping', xy=(50, 1), fontsize=9,
+                 bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.8))
+
+    # Panel D: Steady state distribution
+    ax4 = fig.add_subplot(gs[2, 1])
+    bins_max = 50
+    counts_max, bins_max_edges, _ = ax4.hist(qflux_max_steady, bins=bins_max, alpha=0.7, color='blue',
+             label=f'Maxwellian\n'+r'$\mu=$'+f'{Q_max_mean:.1e}\n'+r'$\sigma=$'+f'{Q_max_std:.1e}',
+             density=True, edgecolor='black', linewidth=0.5)
+    ax4.set_xlabel(r'$Q_i$ (Maxwellian scale)')
+    ax4.set_ylabel('Probability Density')
+    ax4.legend(loc='upper right', fontsize=9, framealpha=0.9)
+    ax4.set_title('(d) Steady State Distribution (Maxwellian)', fontweight='bold', loc='left', fontsize=11)
+    ax4.grid(True, alpha=0.3)
+    ax4.text(0.05, 0.95, f'LB distribution\noff-scale\n(~10⁻⁵)', transform=ax4.transAxes,
+             fontsize=9, va='top', bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.7))
+
+    plt.savefig('fig1_time_evolution.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved fig1_time_evolution.png")
+
+    #==============================================================================
+    # FIGURE 2: Observed vs Expected Statistical Comparison (2 panels)
+    #==============================================================================
+    print("Creating Figure 2: Observed vs Expected...")
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Panel A: Bar chart with error bars
+    categories = ['Maxwellian\n(Baseline)', 'Expected\n(15% red)', 'Expected\n(20% red)',
+                  'Expected\n(25% red)', 'Observed\n(Δ=-0.05)']
+    values = [Q_max_mean, Q_expected_max, Q_expected_mid, Q_expected_min, Q_lb_mean]
+    errors = [Q_max_std, 0, 0, 0, Q_lb_std]
+    colors = ['steelblue', 'lightgreen', 'lightgreen', 'lightgreen', 'crimson']
+
+    bars = ax1.bar(categories, values, yerr=errors, capsize=8, alpha=0.75,
+                   color=colors, edgecolor='black', linewidth=2)
+
+    # Add value labels
+    for i, (bar, val, err) in enumerate(zip(bars, values, errors)):
+        if i == 4:  # Observed
+            ax1.text(bar.get_x() + bar.get_width()/2, val + err + 200,
+                    f'{val:.2e}\n(≈0)', ha='center', va='bottom', fontsize=9, fontweight='bold')
+        else:
+            ax1.text(bar.get_x() + bar.get_width()/2, val + err + 200,
+                    f'{val:.2e}', ha='center', va='bottom', fontsize=9)
+
+    ax1.set_ylabel(r'Ion Heat Flux $Q_i$', fontsize=13)
+    ax1.set_title('(a) Heat Flux: Observed vs Expected', fontweight='bold', fontsize=14)
+    ax1.grid(True, alpha=0.3, axis='y')
+    ax1.set_ylim([0, Q_max_mean * 1.15])
+
+    # Add sigma annotation
+    ax1.annotate('', xy=(0, Q_max_mean), xytext=(4, Q_lb_mean),
+                arrowprops=dict(arrowstyle='<->', color='black', lw=2.5))
+    ax1.text(2, Q_max_mean/2, f'{abs(sigma_vs_null):.1f}σ\nfrom null',
+             ha='center', fontsize=11, fontweight='bold',
+             bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.8))
+
+    # Panel B: Sigma deviation plot
+    scenarios = ['vs Null\n(H₀)', 'vs Theory\n(15% red)', 'vs Theory\n(20% red)', 'vs Theory\n(25% red)']
+    sigmas = [sigma_vs_null, sigma_vs_theory_max, sigma_vs_theory_mid, sigma_vs_theory_min]
+
+    bars2 = ax2.barh(scenarios, sigmas, color=['red', 'orange', 'orange', 'orange'],
+                     alpha=0.75, edgecolor='black', linewidth=2)
+
+    # Add significance thresholds
+    ax2.axvline(-5, color='green', linestyle='--', linewidth=2.5, alpha=0.8, label='5σ (gold standard)')
+    ax2.axvline(-3, color='blue', linestyle='--', linewidth=2.5, alpha=0.8, label='3σ (evidence)')
+    ax2.axvline(-2, color='gray', linestyle='--', linewidth=2, alpha=0.6, label='2σ (suggestive)')
+
+    # Add value labels
+    for bar, sig in zip(bars2, sigmas):
+        ax2.text(sig-0.5, bar.get_y() + bar.get_height()/2, f'{sig:.1f}σ',
+                ha='right', va='center', fontsize=11, fontweight='bold', color='white')
+
+    ax2.set_xlabel('Standard Deviations (σ)', fontsize=13)
+    ax2.set_title('(b) Statistical Significance', fontweight='bold', fontsize=14)
+    ax2.legend(loc='lower left', fontsize=10, framealpha=0.9)
+    ax2.grid(True, alpha=0.3, axis='x')
+    ax2.set_xlim([min(sigmas)-2, 0])
+
+    plt.tight_layout()
+    plt.savefig('fig2_observed_vs_expected.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved fig2_observed_vs_expected.png")
+
+    #==============================================================================
+    # FIGURE 3: Hypothesis Testing Summary (2 panels)
+    #==============================================================================
+    print("Creating Figure 3: Hypothesis Testing Summary...")
+
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+
+    # Panel A: O-E comparison
+    O_E_values = [
+        Q_lb_mean - Q_max_mean,  # vs null
+        Q_lb_mean - Q_expected_max,  # vs 15%
+        Q_lb_mean - Q_expected_mid,  # vs 20%
+        Q_lb_mean - Q_expected_min   # vs 25%
+    ]
+    labels_oe = ['vs Null\n(no effect)', 'vs Theory\n(15% red)', 'vs Theory\n(20% red)', 'vs Theory\n(25% red)']
+
+    bars = ax1.barh(labels_oe, O_E_values, color=['red', 'orange', 'orange', 'orange'],
+                    alpha=0.75, edgecolor='black', linewidth=2)
+
+    for bar, val in zip(bars, O_E_values):
+        ax1.text(val - 100, bar.get_y() + bar.get_height()/2, f'{val:.1e}',
+                ha='right', va='center', fontsize=10, fontweight='bold', color='white')
+
+    ax1.axvline(0, color='black', linestyle='-', linewidth=2)
+    ax1.set_xlabel('Observed - Expected (O - E)', fontsize=13)
+    ax1.set_title('(a) Observed minus Expected Values', fontweight='bold', fontsize=14)
+    ax1.grid(True, alpha=0.3, axis='x')
+    ax1.text(0.05, 0.95, 'All O-E < 0:\nObserved far below\nall predictions',
+             transform=ax1.transAxes, fontsize=10, va='top',
+             bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+
+    # Panel B: Confidence intervals
+    from scipy.stats import t as t_dist
+
+    # Calculate confidence intervals
+    n_max = len(qflux_max_steady)
+    n_lb = len(qflux_lb_steady)
+    dof = n_max + n_lb - 2
+
+    Q_max_sem = Q_max_std / np.sqrt(n_max)
+    Q_lb_sem = Q_lb_std / np.sqrt(n_lb)
+
+    t_95 = t_dist.ppf(0.975, dof)
+    t_99 = t_dist.ppf(0.995, dof)
+
+    ci_95_max = (Q_max_mean - t_95*Q_max_sem, Q_max_mean + t_95*Q_max_sem)
+    ci_99_max = (Q_max_mean - t_99*Q_max_sem, Q_max_mean + t_99*Q_max_sem)
+    ci_95_lb = (Q_lb_mean - t_95*Q_lb_sem, Q_lb_mean + t_95*Q_lb_sem)
+    ci_99_lb = (Q_lb_mean - t_99*Q_lb_sem, Q_lb_mean + t_99*Q_lb_sem)
+
+    # Plot confidence intervals
+    y_pos = [1, 0]
+    labels_ci = ['Maxwellian', 'Lynden-Bell\n(×10⁵)']
+
+    # Maxwellian CIs
+    ax2.plot([ci_99_max[0], ci_99_max[1]], [y_pos[0], y_pos[0]], 'b-', linewidth=8, alpha=0.3, label='99% CI')
+    ax2.plot([ci_95_max[0], ci_95_max[1]], [y_pos[0], y_pos[0]], 'b-', linewidth=12, alpha=0.6, label='95% CI')
+    ax2.plot(Q_max_mean, y_pos[0], 'bo', markersize=10, label='Mean')
+
+    # Lynden-Bell CIs (scaled)
+    lb_scale = 1e5
+    ax2_twin = ax2.twiny()
+    ax2_twin.plot([ci_99_lb[0]*lb_scale, ci_99_lb[1]*lb_scale], [y_pos[1], y_pos[1]],
+                  'r-', linewidth=8, alpha=0.3)
+    ax2_twin.plot([ci_95_lb[0]*lb_scale, ci_95_lb[1]*lb_scale], [y_pos[1], y_pos[1]],
+                  'r-', linewidth=12, alpha=0.6)
+    ax2_twin.plot(Q_lb_mean*lb_scale, y_pos[1], 'ro', markersize=10)
+
+    ax2.set_yticks(y_pos)
+    ax2.set_yticklabels(labels_ci)
+    ax2.set_xlabel(r'$Q_i$ (Maxwellian)', fontsize=13)
+    ax2_twin.set_xlabel(r'$Q_i \times 10^5$ (Lynden-Bell)', fontsize=13, color='red')
+    ax2_twin.tick_params(axis='x', labelcolor='red')
+    ax2.set_title('(b) Confidence Intervals (Non-Overlapping)', fontweight='bold', fontsize=14)
+    ax2.legend(loc='upper right', fontsize=10, framealpha=0.9)
+    ax2.grid(True, alpha=0.3, axis='x')
+    ax2.set_ylim([-0.5, 1.5])
+
+    plt.tight_layout()
+    plt.savefig('fig3_hypothesis_testing.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved fig3_hypothesis_testing.png")
+
+    #==============================================================================
+    # FIGURE 4: Physical Mechanism (3 panels)
+    #==============================================================================
+    print("Creating Figure 4: Physical Mechanism...")
+
+    fig = plt.figure(figsize=(15, 5))
+    gs = GridSpec(1, 3, figure=fig, wspace=0.3)
+
+    # Panel A: Linear growth phase
+    ax1 = fig.add_subplot(gs[0, 0])
+    linear_idx = 2000  # First 2000 steps
+    t_linear = t[:linear_idx]
+    phi2_max_linear = phi2_max[:linear_idx]
+    phi2_lb_linear = phi2_lb[:linear_idx]
+
+    # Find growth region for Maxwellian
+    growth_start = 100
+    growth_end = 1000
+    t_growth = t_linear[growth_start:growth_end]
+    phi2_growth = phi2_max_linear[growth_start:growth_end]
+
+    # Fit exponential: log(phi2) = log(A) + gamma*t
+    log_phi2 = np.log(phi2_growth + 1e-10)
+    coeffs = np.polyfit(t_growth, log_phi2, 1)
+    gamma_max = coeffs[0]
+
+    ax1.semilogy(t_linear, phi2_max_linear, 'b-', linewidth=2, label='Maxwellian')
+    ax1.semilogy(t_linear, phi2_lb_linear, 'r-', linewidth=2, label='Lynden-Bell')
+
+    # Plot fit line
+    ax1.semilogy(t_growth, np.exp(coeffs[1] + coeffs[0]*t_growth), 'b--',
+                 linewidth=2, alpha=0.7, label=f'Fit: γ={gamma_max:.3f}')
+
+    ax1.set_xlabel(r'Time ($R/v_{\rm thi}$)')
+    ax1.set_ylabel(r'$|\phi|^2$')
+    ax1.legend(loc='lower right', framealpha=0.9)
+    ax1.grid(True, alpha=0.3, which='both')
+    ax1.set_title('(a) Linear Phase: Growth vs Damping', fontweight='bold')
+    ax1.set_xlim([0, t_linear[-1]])
+
+    # Panel B: Turbulence spectra comparison
+    ax2 = fig.add_subplot(gs[0, 1])
+
+    if os.path.exists('moment_spectra.npz'):
+        # Measured shell spectra from analysis/moment_spectra.py (Vlasov M0/M2ij)
+        spectra = np.load('moment_spectra.npz')
+        k_shell = spectra['k']
+        counts = spectra['counts']
+        sel = (k_shell > 0) & (counts > 0)
+        late = steady_start(spectra['E_dn'].sum(axis=1))
+
+        def shell_average(E):
+            # shells with only round-off power (< 1e-12 of the peak) are not drawn
+            E = np.where(E > 1e-12 * E.max(), E, np.nan)
+            return E[sel] / counts[sel]
+
+        E_dn_first = shell_average(spectra['E_dn'][0])
+        E_dn_late = shell_average(spectra['E_dn'][late:].mean(axis=0))
+        E_p_late = shell_average((spectra['E_pxx'] + spectra['E_pyy'] + spectra['E_pzz'])[late:].mean(axis=0))
+
+        ax2.loglog(k_shell[sel], E_dn_first, 'k:', linewidth=2, label=r'$\delta n$ (initial)')
+        ax2.loglog(k_shell[sel], E_dn_late, 'b-o', linewidth=2, label=r'$\delta n$ (late)')
+        ax2.loglog(k_shell[sel], E_p_late, 'r-s', linewidth=2, label=r'$\sum_i \delta P_{ii}$ (late)')
+        if 'E_seeded' in spectra:
+            # shell average of the 26 seeded k^(-10/3) modes, scaled to the initial peak
+            E_seed = shell_average(spectra['E_seeded'])
+            peak = np.nanargmax(E_dn_first)
+            ax2.loglog(k_shell[sel], E_seed * E_dn_first[peak] / E_seed[peak], 'k--',
+                       linewidth=1.5, alpha=0.5, label=r'seeded modes ($k^{-10/3}$ each)')
+
+        ax2.set_xlabel(r'$k L / 2\pi$')
+        ax2.set_ylabel(r'Shell-averaged power')
+        ax2.legend(loc='upper right', framealpha=0.9)
+        ax2.grid(True, alpha=0.3, which='both')
+        ax2.set_title('(b) Fluctuation Spectra (Measured)', fontweight='bold')
     else:
-        ax1.text(bar.get_x() + bar.get_width()/2, val + err + 200,
-                f'{val:.2e}', ha='center', va='bottom', fontsize=9)
-
-ax1.set_ylabel(r'Ion Heat Flux $Q_i$', fontsize=13)
-ax1.set_title('(a) Heat Flux: Observed vs Expected', fontweight='bold', fontsize=14)
-ax1.grid(True, alpha=0.3, axis='y')
-ax1.set_ylim([0, Q_max_mean * 1.15])
-
-# Add sigma annotation
-ax1.annotate('', xy=(0, Q_max_mean), xytext=(4, Q_lb_mean),
-            arrowprops=dict(arrowstyle='<->', color='black', lw=2.5))
-ax1.text(2, Q_max_mean/2, f'{abs(sigma_vs_null):.1f}σ\nfrom null',
-         ha='center', fontsize=11, fontweight='bold',
-         bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.8))
-
-# Panel B: Sigma deviation plot
-scenarios = ['vs Null\n(H₀)', 'vs Theory\n(15% red)', 'vs Theory\n(20% red)', 'vs Theory\n(25% red)']
-sigmas = [sigma_vs_null, sigma_vs_theory_max, sigma_vs_theory_mid, sigma_vs_theory_min]
-
-bars2 = ax2.barh(scenarios, sigmas, color=['red', 'orange', 'orange', 'orange'],
-                 alpha=0.75, edgecolor='black', linewidth=2)
-
-# Add significance thresholds
-ax2.axvline(-5, color='green', linestyle='--', linewidth=2.5, alpha=0.8, label='5σ (gold standard)')
-ax2.axvline(-3, color='blue', linestyle='--', linewidth=2.5, alpha=0.8, label='3σ (evidence)')
-ax2.axvline(-2, color='gray', linestyle='--', linewidth=2, alpha=0.6, label='2σ (suggestive)')
-
-# Add value labels
-for bar, sig in zip(bars2, sigmas):
-    ax2.text(sig-0.5, bar.get_y() + bar.get_height()/2, f'{sig:.1f}σ',
-            ha='right', va='center', fontsize=11, fontweight='bold', color='white')
-
-ax2.set_xlabel('Standard Deviations (σ)', fontsize=13)
-ax2.set_title('(b) Statistical Significance', fontweight='bold', fontsize=14)
-ax2.legend(loc='lower left', fontsize=10, framealpha=0.9)
-ax2.grid(True, alpha=0.3, axis='x')
-ax2.set_xlim([min(sigmas)-2, 0])
-
-plt.tight_layout()
-plt.savefig('fig2_observed_vs_expected.png', dpi=300, bbox_inches='tight')
-print("✓ Saved fig2_observed_vs_expected.png")
-
-#==============================================================================
-# FIGURE 3: Hypothesis Testing Summary (2 panels)
-#==============================================================================
-print("Creating Figure 3: Hypothesis Testing Summary...")
-
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-
-# Panel A: O-E comparison
-O_E_values = [
-    Q_lb_mean - Q_max_mean,  # vs null
-    Q_lb_mean - Q_expected_max,  # vs 15%
-    Q_lb_mean - Q_expected_mid,  # vs 20%
-    Q_lb_mean - Q_expected_min   # vs 25%
-]
-labels_oe = ['vs Null\n(no effect)', 'vs Theory\n(15% red)', 'vs Theory\n(20% red)', 'vs Theory\n(25% red)']
-
-bars = ax1.barh(labels_oe, O_E_values, color=['red', 'orange', 'orange', 'orange'],
-                alpha=0.75, edgecolor='black', linewidth=2)
-
-for bar, val in zip(bars, O_E_values):
-    ax1.text(val - 100, bar.get_y() + bar.get_height()/2, f'{val:.1e}',
-            ha='right', va='center', fontsize=10, fontweight='bold', color='white')
-
-ax1.axvline(0, color='black', linestyle='-', linewidth=2)
-ax1.set_xlabel('Observed - Expected (O - E)', fontsize=13)
-ax1.set_title('(a) Observed minus Expected Values', fontweight='bold', fontsize=14)
-ax1.grid(True, alpha=0.3, axis='x')
-ax1.text(0.05, 0.95, 'All O-E < 0:\nObserved far below\nall predictions',
-         transform=ax1.transAxes, fontsize=10, va='top',
-         bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
-
-# Panel B: Confidence intervals
-from scipy.stats import t as t_dist
-
-# Calculate confidence intervals
-n_max = len(qflux_max_steady)
-n_lb = len(qflux_lb_steady)
-dof = n_max + n_lb - 2
-
-Q_max_sem = Q_max_std / np.sqrt(n_max)
-Q_lb_sem = Q_lb_std / np.sqrt(n_lb)
-
-t_95 = t_dist.ppf(0.975, dof)
-t_99 = t_dist.ppf(0.995, dof)
-
-ci_95_max = (Q_max_mean - t_95*Q_max_sem, Q_max_mean + t_95*Q_max_sem)
-ci_99_max = (Q_max_mean - t_99*Q_max_sem, Q_max_mean + t_99*Q_max_sem)
-ci_95_lb = (Q_lb_mean - t_95*Q_lb_sem, Q_lb_mean + t_95*Q_lb_sem)
-ci_99_lb = (Q_lb_mean - t_99*Q_lb_sem, Q_lb_mean + t_99*Q_lb_sem)
-
-# Plot confidence intervals
-y_pos = [1, 0]
-labels_ci = ['Maxwellian', 'Lynden-Bell\n(×10⁵)']
-
-# Maxwellian CIs
-ax2.plot([ci_99_max[0], ci_99_max[1]], [y_pos[0], y_pos[0]], 'b-', linewidth=8, alpha=0.3, label='99% CI')
-ax2.plot([ci_95_max[0], ci_95_max[1]], [y_pos[0], y_pos[0]], 'b-', linewidth=12, alpha=0.6, label='95% CI')
-ax2.plot(Q_max_mean, y_pos[0], 'bo', markersize=10, label='Mean')
-
-# Lynden-Bell CIs (scaled)
-lb_scale = 1e5
-ax2_twin = ax2.twiny()
-ax2_twin.plot([ci_99_lb[0]*lb_scale, ci_99_lb[1]*lb_scale], [y_pos[1], y_pos[1]],
-              'r-', linewidth=8, alpha=0.3)
-ax2_twin.plot([ci_95_lb[0]*lb_scale, ci_95_lb[1]*lb_scale], [y_pos[1], y_pos[1]],
-              'r-', linewidth=12, alpha=0.6)
-ax2_twin.plot(Q_lb_mean*lb_scale, y_pos[1], 'ro', markersize=10)
-
-ax2.set_yticks(y_pos)
-ax2.set_yticklabels(labels_ci)
-ax2.set_xlabel(r'$Q_i$ (Maxwellian)', fontsize=13)
-ax2_twin.set_xlabel(r'$Q_i \times 10^5$ (Lynden-Bell)', fontsize=13, color='red')
-ax2_twin.tick_params(axis='x', labelcolor='red')
-ax2.set_title('(b) Confidence Intervals (Non-Overlapping)', fontweight='bold', fontsize=14)
-ax2.legend(loc='upper right', fontsize=10, framealpha=0.9)
-ax2.grid(True, alpha=0.3, axis='x')
-ax2.set_ylim([-0.5, 1.5])
-
-plt.tight_layout()
-plt.savefig('fig3_hypothesis_testing.png', dpi=300, bbox_inches='tight')
-print("✓ Saved fig3_hypothesis_testing.png")
-
-#==============================================================================
-# FIGURE 4: Physical Mechanism (3 panels)
-#==============================================================================
-print("Creating Figure 4: Physical Mechanism...")
-
-fig = plt.figure(figsize=(15, 5))
-gs = GridSpec(1, 3, figure=fig, wspace=0.3)
-
-# Panel A: Linear growth phase
-ax1 = fig.add_subplot(gs[0, 0])
-linear_idx = 2000  # First 2000 steps
-t_linear = t[:linear_idx]
-phi2_max_linear = phi2_max[:linear_idx]
-phi2_lb_linear = phi2_lb[:linear_idx]
-
-# Find growth region for Maxwellian
-growth_start = 100
-growth_end = 1000
-t_growth = t_linear[growth_start:growth_end]
-phi2_growth = phi2_max_linear[growth_start:growth_end]
-
-# Fit exponential: log(phi2) = log(A) + gamma*t
-log_phi2 = np.log(phi2_growth + 1e-10)
-coeffs = np.polyfit(t_growth, log_phi2, 1)
-gamma_max = coeffs[0]
-
-ax1.semilogy(t_linear, phi2_max_linear, 'b-', linewidth=2, label='Maxwellian')
-ax1.semilogy(t_linear, phi2_lb_linear, 'r-', linewidth=2, label='Lynden-Bell')
-
-# Plot fit line
-ax1.semilogy(t_growth, np.exp(coeffs[1] + coeffs[0]*t_growth), 'b--',
-             linewidth=2, alpha=0.7, label=f'Fit: γ={gamma_max:.3f}')
-
-ax1.set_xlabel(r'Time ($R/v_{\rm thi}$)')
-ax1.set_ylabel(r'$|\phi|^2$')
-ax1.legend(loc='lower right', framealpha=0.9)
-ax1.grid(True, alpha=0.3, which='both')
-ax1.set_title('(a) Linear Phase: Growth vs Damping', fontweight='bold')
-ax1.set_xlim([0, t_linear[-1]])
-
-# Panel B: Turbulence spectra comparison (placeholder - use phi2 time average)
-ax2 = fig.add_subplot(gs[0, 1])
-
-# Create mock k-spectrum (we don't have actual k-space data)
-k_perp = np.logspace(-0.5, 1, 50)
-E_max = phi2_max[len(t)//2:].mean() * k_perp**(-5/3) * np.exp(-k_perp/3)
-E_lb = phi2_lb[len(t)//2:].mean() * k_perp**(-5/3) * np.exp(-k_perp/3)
-
-ax2.loglog(k_perp, E_max, 'b-', linewidth=2, label='Maxwellian')
-ax2.loglog(k_perp, E_lb, 'r-', linewidth=2, label='Lynden-Bell')
-ax2.loglog(k_perp, k_perp**(-5/3) * 1e7, 'k--', linewidth=1.5, alpha=0.5, label=r'$k^{-5/3}$')
-
-ax2.set_xlabel(r'$k_\perp \rho_i$')
-ax2.set_ylabel(r'$E(k_\perp)$')
-ax2.legend(loc='upper right', framealpha=0.9)
-ax2.grid(True, alpha=0.3, which='both')
-ax2.set_title('(b) Turbulence Spectra (Schematic)', fontweight='bold')
-ax2.text(0.05, 0.05, 'Based on φ² amplitude\n(k-space data not available)',
-         transform=ax2.transAxes, fontsize=8, va='bottom',
-         bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.7))
-
-# Panel C: Pressure anisotropy evolution (constant by construction)
-ax3 = fig.add_subplot(gs[0, 2])
-
-Delta_max = np.zeros_like(t)  # Maxwellian: Delta = 0
-Delta_lb = -0.05 * np.ones_like(t)  # Lynden-Bell: Delta = -0.05
-Delta_strong = -0.25 * np.ones_like(t)  # Strong case (failed)
-
-ax3.plot(t, Delta_max, 'b-', linewidth=2, label='Maxwellian (Δ=0)')
-ax3.plot(t, Delta_lb, 'r-', linewidth=2, label='Lynden-Bell (Δ=-0.05)')
-ax3.axhline(-0.25, color='gray', linestyle=':', linewidth=2, alpha=0.7,
-            label='Strong case (Δ=-0.25, unstable)')
-ax3.axhspan(-0.05, -0.25, alpha=0.1, color='red', label='Unstable region')
-
-ax3.set_xlabel(r'Time ($R/v_{\rm thi}$)')
-ax3.set_ylabel(r'Pressure Anisotropy $\Delta$')
-ax3.legend(loc='lower right', framealpha=0.9, fontsize=9)
-ax3.grid(True, alpha=0.3)
-ax3.set_title('(c) Pressure Anisotropy (Imposed)', fontweight='bold')
-ax3.set_ylim([-0.3, 0.05])
-
-plt.savefig('fig4_physical_mechanism.png', dpi=300, bbox_inches='tight')
-print("✓ Saved fig4_physical_mechanism.png")
-
-#==============================================================================
-# FIGURE 5: Connection to Papers 3 & 5 (Conceptual Diagram)
-#==============================================================================
-print("Creating Figure 5: Papers 3 & 5 Connection...")
-
-fig, ax = plt.subplots(1, 1, figsize=(14, 10))
-ax.set_xlim([0, 10])
-ax.set_ylim([0, 10])
-ax.axis('off')
-
-# Title
-ax.text(5, 9.5, 'Lynden-Bell Theory: From Collisionless Relaxation to Turbulent Constraints',
-        ha='center', fontsize=16, fontweight='bold')
-
-# Papers 3 & 5 box
-box1 = FancyBboxPatch((0.5, 7), 4, 1.8, boxstyle="round,pad=0.1",
-                       edgecolor='blue', facecolor='lightblue', linewidth=3)
-ax.add_patch(box1)
-ax.text(2.5, 8.5, 'Papers 3 & 5: Vlasov Simulations', ha='center', fontsize=13, fontweight='bold')
-ax.text(2.5, 8.1, 'Collisionless Relaxation', ha='center', fontsize=11)
-ax.text(2.5, 7.7, '(No pre-existing turbulence)', ha='center', fontsize=10, style='italic')
-ax.text(2.5, 7.3, r'System relaxes TO $\Delta \approx -1/(2\beta)$', ha='center', fontsize=11)
-
-# Paper 6 box
-box2 = FancyBboxPatch((5.5, 7), 4, 1.8, boxstyle="round,pad=0.1",
-                       edgecolor='red', facecolor='lightcoral', linewidth=3)
-ax.add_patch(box2)
-ax.text(7.5, 8.5, 'Paper 6: Gyrokinetic Simulations', ha='center', fontsize=13, fontweight='bold')
-ax.text(7.5, 8.1, 'Turbulent ITG Plasma', ha='center', fontsize=11)
-ax.text(7.5, 7.7, '(Gradient-driven instability)', ha='center', fontsize=10, style='italic')
-ax.text(7.5, 7.3, r'Constraints BEFORE reaching $\Delta$', ha='center', fontsize=11)
-
-# Arrow between boxes
-arrow = FancyArrowPatch((4.5, 7.9), (5.5, 7.9), arrowstyle='->',
-                       mutation_scale=30, linewidth=2.5, color='black')
-ax.add_patch(arrow)
-
-# Key distinction box
-box3 = FancyBboxPatch((1.5, 5.2), 7, 1.3, boxstyle="round,pad=0.1",
-                       edgecolor='purple', facecolor='lavender', linewidth=2)
-ax.add_patch(box3)
-ax.text(5, 6.2, 'Key Distinction', ha='center', fontsize=12, fontweight='bold', color='purple')
-ax.text(5, 5.85, 'Papers 3&5: Relaxation in ABSENCE of gradient-driven turbulence',
-        ha='center', fontsize=10)
-ax.text(5, 5.5, 'Paper 6: Anisotropy IN PRESENCE of ITG turbulence',
-        ha='center', fontsize=10)
-
-# Dual constraints discovered
-ax.text(5, 4.7, 'Dual Constraints Discovered in Paper 6:',
-        ha='center', fontsize=13, fontweight='bold')
-
-# Constraint 1: Kinetic instability
-box4 = FancyBboxPatch((0.5, 2.8), 4.2, 1.5, boxstyle="round,pad=0.1",
-                       edgecolor='red', facecolor='mistyrose', linewidth=2)
-ax.add_patch(box4)
-ax.text(2.6, 4.0, 'Constraint 1:', ha='center', fontsize=11, fontweight='bold', color='red')
-ax.text(2.6, 3.7, 'Kinetic Instability', ha='center', fontsize=11, fontweight='bold')
-ax.text(2.6, 3.4, r'At $|\Delta| > 0.25$:', ha='center', fontsize=10)
-ax.text(2.6, 3.1, 'Mirror-mode or gyrokinetic', ha='center', fontsize=9)
-ax.text(2.6, 2.9, 'ordering violation → NaN', ha='center', fontsize=9)
-
-# Constraint 2: ITG stabilization
-box5 = FancyBboxPatch((5.3, 2.8), 4.2, 1.5, boxstyle="round,pad=0.1",
-                       edgecolor='orange', facecolor='lightyellow', linewidth=2)
-ax.add_patch(box5)
-ax.text(7.4, 4.0, 'Constraint 2:', ha='center', fontsize=11, fontweight='bold', color='orange')
-ax.text(7.4, 3.7, 'Complete ITG Stabilization', ha='center', fontsize=11, fontweight='bold')
-ax.text(7.4, 3.4, r'At $|\Delta| \geq 0.05$:', ha='center', fontsize=10)
-ax.text(7.4, 3.1, 'Turbulence completely suppressed', ha='center', fontsize=9)
-ax.text(7.4, 2.9, r'$Q_i \approx 0$ (17.6σ)', ha='center', fontsize=9)
-
-# Complementary nature box
-box6 = FancyBboxPatch((1, 0.5), 8, 2, boxstyle="round,pad=0.1",
-                       edgecolor='green', facecolor='lightgreen', linewidth=3)
-ax.add_patch(box6)
-ax.text(5, 2.2, 'Complementary Findings (NOT Contradictory!)',
-        ha='center', fontsize=13, fontweight='bold', color='darkgreen')
-ax.text(5, 1.85, r'Papers 3&5: Thermodynamic endpoint is $\Delta \approx -0.5$ (for $\beta \sim 1$)',
-        ha='center', fontsize=10)
-ax.text(5, 1.55, 'Paper 6: Turbulent systems cannot reach this due to kinetic instabilities',
-        ha='center', fontsize=10)
-ax.text(5, 1.25, 'and ITG stabilization at milder anisotropy',
-        ha='center', fontsize=10)
-ax.text(5, 0.85, 'Analogy: Thermodynamics predicts equilibrium T, but kinetic barriers may prevent reaching it',
-        ha='center', fontsize=9, style='italic', color='darkgreen')
-
-plt.savefig('fig5_papers_connection.png', dpi=300, bbox_inches='tight')
-print("✓ Saved fig5_papers_connection.png")
-
-print("\n" + "="*70)
-print("ALL FIGURES GENERATED SUCCESSFULLY!")
-print("="*70)
-print("\nFigures created:")
-print("  1. fig1_time_evolution.png")
-print("  2. fig2_observed_vs_expected.png")
-print("  3. fig3_hypothesis_testing.png")
-print("  4. fig4_physical_mechanism.png")
-print("  5. fig5_papers_connection.png")
-print("\nReady for inclusion in LaTeX manuscript.")
+        # Create mock k-spectrum (we don't have actual k-space data)
+        k_perp = np.logspace(-0.5, 1, 50)
+        E_max = phi2_max[i_steady:].mean() * k_perp**(-5/3) * np.exp(-k_perp/3)
+        E_lb = phi2_lb[i_steady:].mean() * k_perp**(-5/3) * np.exp(-k_perp/3)
+
+        ax2.loglog(k_perp, E_max, 'b-', linewidth=2, label='Maxwellian')
+        ax2.loglog(k_perp, E_lb, 'r-', linewidth=2, label='Lynden-Bell')
+        ax2.loglog(k_perp, k_perp**(-5/3) * 1e7, 'k--', linewidth=1.5, alpha=0.5, label=r'$k^{-5/3}$')
+
+        ax2.set_xlabel(r'$k_\perp \rho_i$')
+        ax2.set_ylabel(r'$E(k_\perp)$')
+        ax2.legend(loc='upper right', framealpha=0.9)
+        ax2.grid(True, alpha=0.3, which='both')
+        ax2.set_title('(b) Turbulence Spectra (Schematic)', fontweight='bold')
+        ax2.text(0.05, 0.05, 'Based on φ² amplitude\n(k-space data not available)',
+                 transform=ax2.transAxes, fontsize=8, va='bottom',
+                 bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.7))
+
+    # Panel C: Pressure anisotropy evolution (constant by construction)
+    ax3 = fig.add_subplot(gs[0, 2])
+
+    Delta_max = np.zeros_like(t)  # Maxwellian: Delta = 0
+    Delta_lb = -0.05 * np.ones_like(t)  # Lynden-Bell: Delta = -0.05
+    Delta_strong = -0.25 * np.ones_like(t)  # Strong case (failed)
+
+    ax3.plot(t, Delta_max, 'b-', linewidth=2, label='Maxwellian (Δ=0)')
+    ax3.plot(t, Delta_lb, 'r-', linewidth=2, label='Lynden-Bell (Δ=-0.05)')
+    ax3.axhline(-0.25, color='gray', linestyle=':', linewidth=2, alpha=0.7,
+                label='Strong case (Δ=-0.25, unstable)')
+    ax3.axhspan(-0.05, -0.25, alpha=0.1, color='red', label='Unstable region')
+
+    ax3.set_xlabel(r'Time ($R/v_{\rm thi}$)')
+    ax3.set_ylabel(r'Pressure Anisotropy $\Delta$')
+    ax3.legend(loc='lower right', framealpha=0.9, fontsize=9)
+    ax3.grid(True, alpha=0.3)
+    ax3.set_title('(c) Pressure Anisotropy (Imposed)', fontweight='bold')
+    ax3.set_ylim([-0.3, 0.05])
+
+    plt.savefig('fig4_physical_mechanism.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved fig4_physical_mechanism.png")
+
+    #==============================================================================
+    # FIGURE 5: Connection to Papers 3 & 5 (Conceptual Diagram)
+    #==============================================================================
+    print("Creating Figure 5: Papers 3 & 5 Connection...")
+
+    fig, ax = plt.subplots(1, 1, figsize=(14, 10))
+    ax.set_xlim([0, 10])
+    ax.set_ylim([0, 10])
+    ax.axis('off')
+
+    # Title
+    ax.text(5, 9.5, 'Lynden-Bell Theory: From Collisionless Relaxation to Turbulent Constraints',
+            ha='center', fontsize=16, fontweight='bold')
+
+    # Papers 3 & 5 box
+    box1 = FancyBboxPatch((0.5, 7), 4, 1.8, boxstyle="round,pad=0.1",
+                           edgecolor='blue', facecolor='lightblue', linewidth=3)
+    ax.add_patch(box1)
+    ax.text(2.5, 8.5, 'Papers 3 & 5: Vlasov Simulations', ha='center', fontsize=13, fontweight='bold')
+    ax.text(2.5, 8.1, 'Collisionless Relaxation', ha='center', fontsize=11)
+    ax.text(2.5, 7.7, '(No pre-existing turbulence)', ha='center', fontsize=10, style='italic')
+    ax.text(2.5, 7.3, r'System relaxes TO $\Delta \approx -1/(2\beta)$', ha='center', fontsize=11)
+
+    # Paper 6 box
+    box2 = FancyBboxPatch((5.5, 7), 4, 1.8, boxstyle="round,pad=0.1",
+                           edgecolor='red', facecolor='lightcoral', linewidth=3)
+    ax.add_patch(box2)
+    ax.text(7.5, 8.5, 'Paper 6: Gyrokinetic Simulations', ha='center', fontsize=13, fontweight='bold')
+    ax.text(7.5, 8.1, 'Turbulent ITG Plasma', ha='center', fontsize=11)
+    ax.text(7.5, 7.7, '(Gradient-driven instability)', ha='center', fontsize=10, style='italic')
+    ax.text(7.5, 7.3, r'Constraints BEFORE reaching $\Delta$', ha='center', fontsize=11)
+
+    # Arrow between boxes
+    arrow = FancyArrowPatch((4.5, 7.9), (5.5, 7.9), arrowstyle='->',
+                           mutation_scale=30, linewidth=2.5, color='black')
+    ax.add_patch(arrow)
+
+    # Key distinction box
+    box3 = FancyBboxPatch((1.5, 5.2), 7, 1.3, boxstyle="round,pad=0.1",
+                           edgecolor='purple', facecolor='lavender', linewidth=2)
+    ax.add_patch(box3)
+    ax.text(5, 6.2, 'Key Distinction', ha='center', fontsize=12, fontweight='bold', color='purple')
+    ax.text(5, 5.85, 'Papers 3&5: Relaxation in ABSENCE of gradient-driven turbulence',
+            ha='center', fontsize=10)
+    ax.text(5, 5.5, 'Paper 6: Anisotropy IN PRESENCE of ITG turbulence',
+            ha='center', fontsize=10)
+
+    # Dual constraints discovered
+    ax.text(5, 4.7, 'Dual Constraints Discovered in Paper 6:',
+            ha='center', fontsize=13, fontweight='bold')
+
+    # Constraint 1: Kinetic instability
+    box4 = FancyBboxPatch((0.5, 2.8), 4.2, 1.5, boxstyle="round,pad=0.1",
+                           edgecolor='red', facecolor='mistyrose', linewidth=2)
+    ax.add_patch(box4)
+    ax.text(2.6, 4.0, 'Constraint 1:', ha='center', fontsize=11, fontweight='bold', color='red')
+    ax.text(2.6, 3.7, 'Kinetic Instability', ha='center', fontsize=11, fontweight='bold')
+    ax.text(2.6, 3.4, r'At $|\Delta| > 0.25$:', ha='center', fontsize=10)
+    ax.text(2.6, 3.1, 'Mirror-mode or gyrokinetic', ha='center', fontsize=9)
+    ax.text(2.6, 2.9, 'ordering violation → NaN', ha='center', fontsize=9)
+
+    # Constraint 2: ITG stabilization
+    box5 = FancyBboxPatch((5.3, 2.8), 4.2, 1.5, boxstyle="round,pad=0.1",
+                           edgecolor='orange', facecolor='lightyellow', linewidth=2)
+    ax.add_patch(box5)
+    ax.text(7.4, 4.0, 'Constraint 2:', ha='center', fontsize=11, fontweight='bold', color='orange')
+    ax.text(7.4, 3.7, 'Complete ITG Stabilization', ha='center', fontsize=11, fontweight='bold')
+    ax.text(7.4, 3.4, r'At $|\Delta| \geq 0.05$:', ha='center', fontsize=10)
+    ax.text(7.4, 3.1, 'Turbulence completely suppressed', ha='center', fontsize=9)
+    ax.text(7.4, 2.9, r'$Q_i \approx 0$' + f' ({abs(sigma_vs_null):.1f}σ)', ha='center', fontsize=9)
+
+    # Complementary nature box
+    box6 = FancyBboxPatch((1, 0.5), 8, 2, boxstyle="round,pad=0.1",
+                           edgecolor='green', facecolor='lightgreen', linewidth=3)
+    ax.add_patch(box6)
+    ax.text(5, 2.2, 'Complementary Findings (NOT Contradictory!)',
+            ha='center', fontsize=13, fontweight='bold', color='darkgreen')
+    ax.text(5, 1.85, r'Papers 3&5: Thermodynamic endpoint is $\Delta \approx -0.5$ (for $\beta \sim 1$)',
+            ha='center', fontsize=10)
+    ax.text(5, 1.55, 'Paper 6: Turbulent systems cannot reach this due to kinetic instabilities',
+            ha='center', fontsize=10)
+    ax.text(5, 1.25, 'and ITG stabilization at milder anisotropy',
+            ha='center', fontsize=10)
+    ax.text(5, 0.85, 'Analogy: Thermodynamics predicts equilibrium T, but kinetic barriers may prevent reaching it',
+            ha='center', fontsize=9, style='italic', color='darkgreen')
+
+    plt.savefig('fig5_papers_connection.png', dpi=300, bbox_inches='tight')
+    print("✓ Saved fig5_papers_connection.png")
+
+    print("\n" + "="*70)
+    print("ALL FIGURES GENERATED SUCCESSFULLY!")
+    print("="*70)
+    print("\nFigures created:")
+    print("  1. fig1_time_evolution.png")
+    print("  2. fig2_observed_vs_expected.png")
+    print("  3. fig3_hypothesis_testing.png")
+    print("  4. fig4_physical_mechanism.png")
+    print("  5. fig5_papers_connection.png")
+    print("\nReady for inclusion in LaTeX manuscript.")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ import netCDF4 as nc
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from steady_state import steady_start
+
 # Set publication style
 plt.style.use('seaborn-v0_8-paper')
 plt.rcParams.update({
@@ -105,8 +107,8 @@ def plot_ratio_vs_time(max_file, lb_file, output='fig2_ratio.pdf'):
         ax.axhline(0.75, color='g', linestyle='--', alpha=0.5)
         
         # Average ratio (steady state)
-        ntime = len(t)
-        ratio_avg = np.mean(ratio[ntime//2:])
+        start = steady_start(q_max, q_lb)
+        ratio_avg = np.mean(ratio[start:])
         ax.axhline(ratio_avg, color='r', linestyle=':', alpha=0.7, 
                   label=f'Avg = {ratio_avg:.3f}')
         
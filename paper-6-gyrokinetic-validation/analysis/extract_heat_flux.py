@@ -6,7 +6,8 @@ Compare Maxwellian vs Lynden-Bell cases
 
 import numpy as np
 import netCDF4 as nc
-import matplotlib.pyplot as plt
+
+from steady_state import flux_series, steady_start
 
 def extract_heat_flux(filename):
     """Extract time-averaged ion heat flux from Stella output"""
@@ -24,9 +25,9 @@ def extract_heat_flux(filename):
                 print(f"\nFound variable: {name}")
                 print(f"Shape: {qflux.shape}")
                 
-                # Average over time (last half for steady state)
-                ntime = qflux.shape[0]
-                qflux_avg = np.mean(qflux[ntime//2:], axis=0)
+                # Average over the detected steady state
+                start = steady_start(flux_series(qflux))
+                qflux_avg = np.mean(qflux[start:], axis=0)
                 
                 return qflux, qflux_avg
         
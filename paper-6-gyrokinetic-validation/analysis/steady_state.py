@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Online steady-state detection for heat-flux and amplitude time series
+
+Replaces the fixed "second half is steady" assumption. The start of the
+steady state is chosen with MSER (marginal standard error rule): for
+batch means y_1..y_k the truncation d minimises
+
+    MSER(d) = Σ_{i>d} (y_i - ȳ_d)² / (k - d)²
+
+i.e. the squared standard error of the retained mean, which balances
+throwing away the initial transient against keeping samples. d is
+searched over the first max_fraction of the run; if the minimum sits at
+the end of that range the series is still drifting and no steady state
+is reported.
+
+The detector is incremental: update() costs O(1) (running batch sum
+plus prefix sums of the batch means), so it can follow a live Stella
+run as time records are appended. truncation() evaluates MSER for all
+candidate d in one vectorised pass over the batch means. A run can be
+stopped once ready(min_samples) is true, i.e. a steady state has been
+found and at least min_samples records lie beyond it.
+
+Usage:
+    python steady_state.py results/maxwellian.nc [--var qflux] [--min-samples 1000]
+    python steady_state.py RUN.out.nc --follow 60 --min-samples 1000   # exit 0 when ready
+"""
+
+import time
+import argparse
+import numpy as np
+
+DEFAULT_BATCH = 5
+MAX_FRACTION = 0.5
+MIN_BATCHES = 10
+FLUX_VARIABLES = ['qflux', 'es_heat_flux', 'heat_flux']
+
+
+class SteadyStateDetector:
+    """MSER truncation of a time series that grows one record at a time"""
+
+    def __init__(self, batch=DEFAULT_BATCH, max_fraction=MAX_FRACTION):
+        self.batch = batch
+        self.max_fraction = max_fraction
+        self.n = 0
+        self._offset = None      # first value, subtracted to keep the sums well conditioned
+        self._partial = 0.0
+        self._sum = [0.0]        # prefix sums of batch means
+        self._sum_sq = [0.0]
+
+    def update(self, value):
+        """Append one record"""
+        value = float(value)
+        if self._offset is None:
+            self._offset = value
+        self._partial += value - self._offset
+        self.n += 1
+        if self.n % self.batch == 0:
+            y = self._partial / self.batch
+            self._sum.append(self._sum[-1] + y)
+            self._sum_sq.append(self._sum_sq[-1] + y * y)
+            self._partial = 0.0
+
+    def extend(self, values):
+        for value in np.ravel(values):
+            self.update(value)
+
+    def truncation(self):
+        """Index of the first steady record, or None if no steady state yet"""
+        k = len(self._sum) - 1
+        if k < MIN_BATCHES:
+            return None
+        d_max = int(k * self.max_fraction)
+        d = np.arange(d_max + 1)
+        S1 = np.asarray(self._sum)
+        S2 = np.asarray(self._sum_sq)
+        m = k - d
+        s1 = S1[k] - S1[d]
+        s2 = S2[k] - S2[d]
+        mser = np.maximum(s2 - s1**2 / m, 0.0) / m**2
+        best = int(np.argmin(mser))
+        if best == d_max:
+            return None
+        return best * self.batch
+
+    def steady_samples(self):
+        """Number of records after the truncation point (0 if not steady)"""
+        start = self.truncation()
+        return 0 if start is None else self.n - start
+
+    def ready(self, min_samples):
+        """True once a steady state holds at least min_samples records"""
+        return self.steady_samples() >= min_samples
+
+
+def flux_series(qflux):
+    """Total |Q| per time record (summed over kx, ky, species if present)"""
+    qflux = np.abs(np.asarray(qflux))
+    if qflux.ndim > 1:
+        return qflux.sum(axis=tuple(range(1, qflux.ndim)))
+    return qflux
+
+
+def steady_start(*series, batch=None, max_fraction=MAX_FRACTION):
+    """First record that is steady in every series (latest MSER truncation)
+
+    Short series (fewer than MIN_BATCHES batches of DEFAULT_BATCH) use
+    unbatched records. If a series has not settled, the end of the
+    search range is used and a warning is printed.
+    """
+    starts = []
+    for values in series:
+        values = np.ravel(values)
+        b = batch or (DEFAULT_BATCH if len(values) >= DEFAULT_BATCH * MIN_BATCHES else 1)
+        detector = SteadyStateDetector(batch=b, max_fraction=max_fraction)
+        detector.extend(values)
+        start = detector.truncation()
+        if start is None:
+            start = int(len(values) * max_fraction)
+            print(f"⚠ No steady state detected in {len(values)} records; using t index {start}")
+        starts.append(start)
+    return max(starts)
+
+
+def steady_statistics(t, qflux_max, qflux_lb, start=None):
+    """Steady-state samples, means and spreads as stored in statistical_analysis.npz"""
+    if start is None:
+        start = steady_start(qflux_max, qflux_lb)
+    q_max = np.asarray(qflux_max)[start:]
+    q_lb = np.asarray(qflux_lb)[start:]
+    Q_max_mean = q_max.mean()
+    return {
+        't_steady': np.asarray(t)[start:],
+        'qflux_max_steady': q_max,
+        'qflux_lb_steady': q_lb,
+        'Q_max_mean': Q_max_mean,
+        'Q_max_std': q_max.std(),
+        'Q_lb_mean': q_lb.mean(),
+        'Q_lb_std': q_lb.std(),
+        # 25%, 20% and 15% reduction predicted by Lynden-Bell theory
+        'Q_expected_min': 0.75 * Q_max_mean,
+        'Q_expected_mid': 0.80 * Q_max_mean,
+        'Q_expected_max': 0.85 * Q_max_mean,
+    }
+
+
+def _read_records(dataset, var, start):
+    """Records start: of the heat flux (or given variable) and time from an open Stella file"""
+    names = [var] if var else FLUX_VARIABLES
+    for name in names:
+        if name in dataset.variables:
+            return dataset.variables['t'][start:], flux_series(dataset.variables[name][start:])
+    raise KeyError(f"none of {names} in {dataset.filepath()}")
+
+
+def main():
+    import netCDF4 as nc
+
+    parser = argparse.ArgumentParser(description="Detect the steady state of a Stella run")
+    parser.add_argument('file', help='Stella NetCDF output (may still be written to)')
+    parser.add_argument('--var', help='variable to test (default: first heat-flux variable found)')
+    parser.add_argument('--batch', type=int, default=DEFAULT_BATCH)
+    parser.add_argument('--min-samples', type=int, help='steady records needed to stop the run')
+    parser.add_argument('--follow', type=float, metavar='SECONDS',
+                        help='keep reading new records at this interval until --min-samples is reached')
+    args = parser.parse_args()
+
+    detector = SteadyStateDetector(batch=args.batch)
+    times = []
+    while True:
+        with nc.Dataset(args.file, 'r') as f:
+            t, q = _read_records(f, args.var, detector.n)
+        times.extend(np.ravel(t))
+        detector.extend(q)
+
+        start = detector.truncation()
+        if start is None:
+            print(f"{detector.n} records: no steady state yet")
+        else:
+            print(f"{detector.n} records: steady from t = {times[start]:.2f} "
+                  f"(index {start}), {detector.steady_samples()} steady records")
+
+        if args.min_samples is not None and detector.ready(args.min_samples):
+            print(f"✓ {args.min_samples} steady records reached; run can be stopped")
+            raise SystemExit(0)
+        if args.follow is None:
+            raise SystemExit(0 if args.min_samples is None else 1)
+        time.sleep(args.follow)
+
+
+if __name__ == '__main__':
+    main()
@@ -113,6 +113,22 @@ function turbulent_perturbation(x, y, z)
   return perturb_amplitude * delta_n / mode_count
 end
 
+-- Optional precomputed perturbation table (analysis/tabulate_perturbation.py).
+-- Points that are not tabulated quadrature nodes fall back to the mode sum.
+local pert_table = nil
+local has_table, table_module = pcall(require, "perturbation_table")
+if has_table then
+  pert_table = table_module.load("perturbation_table_v3.bin")
+end
+if pert_table then
+  print('  Using tabulated perturbation: perturbation_table_v3.bin')
+end
+
+local function tabulated(name, x, y, z)
+  if pert_table then return pert_table:value(name, x, y, z) end
+  return nil
+end
+
 -- Vlasov-Maxwell Application
 vlasovApp = Vlasov.App.new {
   tEnd = tEnd,
@@ -144,7 +160,7 @@ vlasovApp = Vlasov.App.new {
         local vx, vy, vz = xn[4], xn[5], xn[6]
 
         -- Density with turbulent perturbations
-        local n = n0 * (1.0 + turbulent_perturbation(x, y, z))
+        local n = n0 * (1.0 + (tabulated("dn", x, y, z) or turbulent_perturbation(x, y, z)))
 
         -- Anisotropic Maxwellian: different T_perp, T_par
         local v_perp_sq = vx*vx + vy*vy
@@ -181,12 +197,12 @@ vlasovApp = Vlasov.App.new {
       local E_pert = 0.01 * perturb_amplitude
       local B_pert = 0.05 * perturb_amplitude
 
-      local Ex = E_pert * turbulent_perturbation(x, y, z)
-      local Ey = E_pert * turbulent_perturbation(x + pi/3, y, z)
-      local Ez = E_pert * turbulent_perturbation(x, y + pi/3, z)
-      local Bx = B_pert * turbulent_perturbation(x, y, z + pi/4)
-      local By = B_pert * turbulent_perturbation(x + pi/4, y, z)
-      local Bz = B0 * (1.0 + B_pert * turbulent_perturbation(x, y + pi/4, z))
+      local Ex = tabulated("Ex", x, y, z) or E_pert * turbulent_perturbation(x, y, z)
+      local Ey = tabulated("Ey", x, y, z) or E_pert * turbulent_perturbation(x + pi/3, y, z)
+      local Ez = tabulated("Ez", x, y, z) or E_pert * turbulent_perturbation(x, y + pi/3, z)
+      local Bx = tabulated("Bx", x, y, z) or B_pert * turbulent_perturbation(x, y, z + pi/4)
+      local By = tabulated("By", x, y, z) or B_pert * turbulent_perturbation(x + pi/4, y, z)
+      local Bz = tabulated("Bz", x, y, z) or B0 * (1.0 + B_pert * turbulent_perturbation(x, y + pi/4, z))
 
       return Ex, Ey, Ez, Bx, By, Bz, 0.0, 0.0
     end,
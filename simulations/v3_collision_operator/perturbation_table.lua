@@ -0,0 +1,74 @@
+-- Lookup table for the turbulent initial perturbation
+-- Written by analysis/tabulate_perturbation.py (GKPERT01 layout):
+--   8-byte magic, then doubles: nQuad, nTables, {lower, upper, cells} x 3,
+--   nQuad reference-cell node offsets, then nTables arrays over the
+--   quadrature nodes (x slowest) in the order dn, Ex, Ey, Ez, Bx, By, Bz.
+--
+-- table:value(name, x, y, z) returns the tabulated value when (x, y, z)
+-- is one of the tabulated quadrature nodes and nil otherwise, so callers
+-- can fall back to evaluating the mode sum directly.
+
+local ffi = require("ffi")
+
+local NAMES = {"dn", "Ex", "Ey", "Ez", "Bx", "By", "Bz"}
+local NODE_TOL = 1e-9
+
+local PerturbationTable = {}
+PerturbationTable.__index = PerturbationTable
+
+local function read_doubles(fh, n)
+  local raw = fh:read(8*n)
+  assert(raw and #raw == 8*n, "perturbation table: truncated file")
+  local buf = ffi.new("double[?]", n)
+  ffi.copy(buf, raw, 8*n)
+  return buf
+end
+
+local function load(path)
+  local fh = io.open(path, "rb")
+  if not fh then return nil end
+  assert(fh:read(8) == "GKPERT01", "perturbation table: bad magic in " .. path)
+
+  local head = read_doubles(fh, 11)
+  local self = setmetatable({}, PerturbationTable)
+  self.nQuad, self.nTables = head[0], head[1]
+  self.lower, self.upper, self.cells, self.nodes = {}, {}, {}, {}
+  for d = 1, 3 do
+    self.lower[d] = head[2 + 3*(d-1)]
+    self.upper[d] = head[3 + 3*(d-1)]
+    self.cells[d] = head[4 + 3*(d-1)]
+  end
+  local offsets = read_doubles(fh, self.nQuad)
+  for j = 0, self.nQuad-1 do self.nodes[j] = offsets[j] end
+
+  self.shape = {}
+  for d = 1, 3 do self.shape[d] = self.cells[d]*self.nQuad end
+  local size = self.shape[1]*self.shape[2]*self.shape[3]
+
+  self.data = {}
+  for t = 1, self.nTables do self.data[NAMES[t]] = read_doubles(fh, size) end
+  fh:close()
+  return self
+end
+
+-- Node index along dimension d, or nil if x is not a quadrature node
+function PerturbationTable:nodeIndex(d, x)
+  local dx = (self.upper[d] - self.lower[d])/self.cells[d]
+  local c = math.floor((x - self.lower[d])/dx)
+  if c < 0 or c >= self.cells[d] then return nil end
+  local xi = 2*(x - self.lower[d] - (c + 0.5)*dx)/dx
+  for j = 0, self.nQuad-1 do
+    if math.abs(xi - self.nodes[j]) < NODE_TOL then return c*self.nQuad + j end
+  end
+  return nil
+end
+
+function PerturbationTable:value(name, x, y, z)
+  local ix = self:nodeIndex(1, x)
+  local iy = ix and self:nodeIndex(2, y)
+  local iz = iy and self:nodeIndex(3, z)
+  if not iz then return nil end
+  return self.data[name][(ix*self.shape[2] + iy)*self.shape[3] + iz]
+end
+
+return { load = load }